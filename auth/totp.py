@@ -5,30 +5,54 @@ Time-based One-Time Password authentication for packet radio.
 Safe for cleartext transmission - no passwords sent over the air!
 """
 
-import pyotp
+import base64
+import binascii
+from collections import deque
+import hashlib
+import heapq
+import hmac
+import os
 import time
 import yaml
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
-import secrets
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
 
-@dataclass
+
+# RFC 6238 parameters (matches authenticator app defaults)
+TOTP_INTERVAL = 30   # seconds per time step
+TOTP_DIGITS = 6
+TOTP_WINDOW = 3      # accepted steps either side of now (±90 seconds)
+
+# Rate limiting: MAX_FAILED_ATTEMPTS failures within RATE_LIMIT_SECONDS = lockout
+MAX_FAILED_ATTEMPTS = 5
+RATE_LIMIT_SECONDS = 300
+
+
+def _canon(callsign: str) -> str:
+    """Canonical (uppercase) callsign, reusing the input when already canonical"""
+    return callsign if callsign.isascii() and callsign.isupper() else callsign.upper()
+
+
+@dataclass(slots=True)
 class Session:
-    """Represents an authenticated session"""
+    """Represents an authenticated session (timestamps from time.monotonic())"""
     callsign: str
-    authenticated_at: datetime
-    last_activity: datetime
-    session_id: str
+    authenticated_at: float
+    last_activity: float
+    session_id: bytes
 
     def is_expired(self, timeout_minutes: int = 30) -> bool:
         """Check if session has expired"""
-        return datetime.now() - self.last_activity > timedelta(minutes=timeout_minutes)
+        return time.monotonic() - self.last_activity > timeout_minutes * 60
 
     def update_activity(self):
         """Update last activity timestamp"""
-        self.last_activity = datetime.now()
+        self.last_activity = time.monotonic()
 
 
 class TOTPAuthenticator:
@@ -51,22 +75,101 @@ class TOTPAuthenticator:
         """
         self.users_file = users_file
         self.users: Dict[str, str] = {}
-        self.failed_attempts: Dict[str, list] = {}
-        self.used_tokens: Dict[str, Dict[str, float]] = {}  # callsign -> {token -> expiry_time}
+        self._secret_keys: Dict[str, bytes] = {}  # callsign -> decoded HMAC key
+        self._users_stat: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of last parse
+        self.failed_attempts: Dict[str, Deque[float]] = {}  # callsign -> last N failure times
+        # Replay prevention: time steps already consumed per callsign, plus
+        # a min-heap of (expiry_time, (callsign, counter)) for purging. Steps
+        # anywhere in the drift window can be consumed, so insertion order
+        # is not expiry order.
+        self._consumed_steps: Set[Tuple[str, int]] = set()
+        self._consumed_expiry: List[Tuple[float, Tuple[str, int]]] = []
         self.load_users()
 
     def load_users(self):
-        """Load users from YAML configuration file"""
+        """Load users from YAML configuration file (skipped if the file is unchanged)"""
         try:
-            with open(self.users_file, 'r') as f:
-                data = yaml.safe_load(f)
+            st = os.stat(self.users_file)
+            file_stat = (st.st_mtime_ns, st.st_size)
+            if file_stat == self._users_stat:
+                return
+
+            with open(self.users_file, 'rb') as f:
+                data = yaml.load(f, Loader=SafeLoader)
                 self.users = data.get('users', {})
+            self._users_stat = file_stat
         except FileNotFoundError:
             print(f"Warning: Users file '{self.users_file}' not found. No users loaded.")
             self.users = {}
+            self._users_stat = None
         except yaml.YAMLError as e:
             print(f"Error parsing users file: {e}")
             self.users = {}
+            self._users_stat = None
+
+        # Decode base32 secrets once so verification only has to run HMAC
+        self._secret_keys = {}
+        for callsign, secret in self.users.items():
+            key = self._decode_secret(secret)
+            if key is None:
+                print(f"Warning: Invalid TOTP secret for {callsign}, skipping.")
+                continue
+            self._secret_keys[callsign] = key
+
+    @staticmethod
+    def _decode_secret(secret: str) -> Optional[bytes]:
+        """
+        Decode a base32 TOTP secret into raw HMAC key bytes.
+
+        Args:
+            secret: Base32 secret (padding optional, case insensitive)
+
+        Returns:
+            Raw key bytes, or None if the secret is not valid base32
+        """
+        try:
+            secret = str(secret).replace(' ', '').upper()
+            return base64.b32decode(secret + '=' * (-len(secret) % 8))
+        except (binascii.Error, ValueError):
+            return None
+
+    @staticmethod
+    def _totp_at(key: bytes, counter: int) -> str:
+        """
+        Compute the TOTP code for a time step (RFC 4226 dynamic truncation).
+
+        Args:
+            key: Raw HMAC key
+            counter: Time step counter
+
+        Returns:
+            Zero-padded code string
+        """
+        digest = hmac.new(key, counter.to_bytes(8, 'big'), hashlib.sha1).digest()
+        offset = digest[-1] & 0x0F
+        code = (int.from_bytes(digest[offset:offset + 4], 'big') & 0x7FFFFFFF) % 10 ** TOTP_DIGITS
+        return f"{code:0{TOTP_DIGITS}d}"
+
+    def _match_counter(self, key: bytes, token: str, now: float) -> Optional[int]:
+        """
+        Find the time step within the accepted window that produced a token.
+
+        Args:
+            key: Raw HMAC key
+            token: Code supplied by the user
+            now: Current Unix time
+
+        Returns:
+            Matching time step counter, or None if no step matches
+        """
+        if len(token) != TOTP_DIGITS or not (token.isascii() and token.isdigit()):
+            return None
+
+        counter = int(now // TOTP_INTERVAL)
+        for c in range(counter - TOTP_WINDOW, counter + TOTP_WINDOW + 1):
+            if hmac.compare_digest(self._totp_at(key, c), token):
+                return c
+        return None
 
     def reload_users(self):
         """Reload users from file (for adding new users without restart)"""
@@ -84,24 +187,23 @@ class TOTPAuthenticator:
         Returns:
             True if rate limited, False otherwise
         """
-        if callsign not in self.failed_attempts:
+        attempts = self.failed_attempts.get(callsign)
+        if attempts is None:
             return False
 
-        # Clean up old attempts (> 5 minutes)
-        cutoff_time = time.time() - 300  # 5 minutes ago
-        self.failed_attempts[callsign] = [
-            attempt for attempt in self.failed_attempts[callsign]
-            if attempt > cutoff_time
-        ]
-
-        # Check if we have 5+ failed attempts in the last 5 minutes
-        return len(self.failed_attempts[callsign]) >= 5
+        # Only the last 5 attempts are kept, so we are limited exactly when
+        # the buffer is full and its oldest entry is inside the window
+        return (
+            len(attempts) >= MAX_FAILED_ATTEMPTS
+            and attempts[0] > time.time() - RATE_LIMIT_SECONDS
+        )
 
     def record_failed_attempt(self, callsign: str):
         """Record a failed authentication attempt"""
-        if callsign not in self.failed_attempts:
-            self.failed_attempts[callsign] = []
-        self.failed_attempts[callsign].append(time.time())
+        attempts = self.failed_attempts.get(callsign)
+        if attempts is None:
+            attempts = self.failed_attempts[callsign] = deque(maxlen=MAX_FAILED_ATTEMPTS)
+        attempts.append(time.time())
 
     def clear_failed_attempts(self, callsign: str):
         """Clear failed attempts for a callsign (on successful auth)"""
@@ -119,7 +221,7 @@ class TOTPAuthenticator:
         Returns:
             Tuple of (success: bool, message: str)
         """
-        callsign = callsign.upper()
+        callsign = _canon(callsign)
 
         # Check rate limiting
         if self.is_rate_limited(callsign):
@@ -130,30 +232,38 @@ class TOTPAuthenticator:
             self.record_failed_attempt(callsign)
             return False, "Invalid callsign or token."
 
-        # Replay attack prevention: reject tokens already used within their validity window
         now = time.time()
-        callsign_used = self.used_tokens.get(callsign, {})
-        # Purge expired entries while we're here
-        callsign_used = {t: exp for t, exp in callsign_used.items() if exp > now}
-        if token in callsign_used:
-            return False, "Code already used. Wait for next code."
-
-        # Get user's TOTP secret
-        secret = self.users[callsign]
-        totp = pyotp.TOTP(secret)
+        self._purge_consumed_steps(now)
 
         # Verify token with ±90 second window (3 intervals @ 30 sec each)
         # This tolerates clock drift between client and server
-        if totp.verify(token, valid_window=3):
-            # Record token as consumed for the full validity window (3 * 30s)
-            callsign_used[token] = now + 90
-            self.used_tokens[callsign] = callsign_used
-            self.clear_failed_attempts(callsign)
-            return True, "Authentication successful."
-        else:
+        key = self._secret_keys.get(callsign)
+        counter = None if key is None else self._match_counter(key, token, now)
+        if counter is None:
             self.record_failed_attempt(callsign)
             return False, "Invalid callsign or token."
 
+        # Replay attack prevention: each time step may only be used once
+        step = (callsign, counter)
+        if step in self._consumed_steps:
+            return False, "Code already used. Wait for next code."
+
+        # Keep the step until it can no longer fall inside the window
+        self._consumed_steps.add(step)
+        heapq.heappush(
+            self._consumed_expiry,
+            ((counter + TOTP_WINDOW + 1) * TOTP_INTERVAL, step)
+        )
+        self.clear_failed_attempts(callsign)
+        return True, "Authentication successful."
+
+    def _purge_consumed_steps(self, now: float):
+        """Forget consumed time steps that have left the validity window"""
+        expiry = self._consumed_expiry
+        while expiry and expiry[0][0] <= now:
+            _, step = heapq.heappop(expiry)
+            self._consumed_steps.discard(step)
+
 
 class SessionManager:
     """
@@ -163,6 +273,13 @@ class SessionManager:
     - Session timeout (default 30 minutes)
     - Automatic cleanup of expired sessions
     - Activity tracking
+
+    Cleanup uses a min-heap of (last_activity, session_id). Entries are not
+    updated on activity; a popped entry whose session has been active since
+    is pushed back with the current timestamp, so cleanup only touches
+    sessions that might actually have expired. Entries for sessions that
+    were ended or dropped are discarded by rebuilding the heap once it holds
+    more than twice as many entries as there are live sessions.
     """
 
     def __init__(self, timeout_minutes: int = 30):
@@ -172,10 +289,12 @@ class SessionManager:
         Args:
             timeout_minutes: Session timeout in minutes (default 30)
         """
-        self.sessions: Dict[str, Session] = {}
+        self.sessions: Dict[bytes, Session] = {}
         self.timeout_minutes = timeout_minutes
+        self.timeout_seconds = timeout_minutes * 60
+        self._expiry_heap: List[Tuple[float, bytes]] = []
 
-    def create_session(self, callsign: str) -> str:
+    def create_session(self, callsign: str) -> bytes:
         """
         Create a new authenticated session.
 
@@ -183,22 +302,24 @@ class SessionManager:
             callsign: Ham radio callsign
 
         Returns:
-            Session ID
+            Session ID (16 random bytes; use .hex() for display)
         """
-        session_id = secrets.token_hex(16)
-        now = datetime.now()
+        session_id = os.urandom(16)
+        now = time.monotonic()
 
         session = Session(
-            callsign=callsign.upper(),
+            callsign=_canon(callsign),
             authenticated_at=now,
             last_activity=now,
             session_id=session_id
         )
 
         self.sessions[session_id] = session
+        heapq.heappush(self._expiry_heap, (now, session_id))
+        self._compact_expiry_heap()
         return session_id
 
-    def get_session(self, session_id: str) -> Optional[Session]:
+    def get_session(self, session_id: bytes) -> Optional[Session]:
         """
         Get a session by ID.
 
@@ -214,27 +335,45 @@ class SessionManager:
         session = self.sessions[session_id]
 
         # Check if expired
-        if session.is_expired(self.timeout_minutes):
+        now = time.monotonic()
+        if now - session.last_activity > self.timeout_seconds:
             del self.sessions[session_id]
+            self._compact_expiry_heap()
             return None
 
         # Update activity and return
-        session.update_activity()
+        session.last_activity = now
         return session
 
-    def end_session(self, session_id: str):
+    def end_session(self, session_id: bytes):
         """End a session (logout)"""
         if session_id in self.sessions:
             del self.sessions[session_id]
+            self._compact_expiry_heap()
+
+    def _compact_expiry_heap(self):
+        """Rebuild the expiry heap from live sessions once it is mostly stale."""
+        if len(self._expiry_heap) > 2 * len(self.sessions):
+            heap = [(session.last_activity, sid) for sid, session in self.sessions.items()]
+            heapq.heapify(heap)
+            self._expiry_heap = heap
 
     def cleanup_expired_sessions(self):
         """Remove all expired sessions"""
-        expired = [
-            sid for sid, session in self.sessions.items()
-            if session.is_expired(self.timeout_minutes)
-        ]
-        for sid in expired:
-            del self.sessions[sid]
+        cutoff = time.monotonic() - self.timeout_seconds
+        heap = self._expiry_heap
+
+        while heap and heap[0][0] < cutoff:
+            _, sid = heapq.heappop(heap)
+            session = self.sessions.get(sid)
+            if session is None:
+                # Already ended or removed by get_session()
+                continue
+            if session.last_activity < cutoff:
+                del self.sessions[sid]
+            else:
+                # Stale entry - session was active since it was pushed
+                heapq.heappush(heap, (session.last_activity, sid))
 
     def get_active_sessions(self) -> list:
         """Get list of all active sessions"""
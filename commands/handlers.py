@@ -5,11 +5,12 @@ Execute parsed and validated commands.
 """
 
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from .models import Command, CommandType
 from homeassistant.client import HomeAssistantClient
 from homeassistant.filters import EntityMapper
 from formatting import (
+    Paginator,
     format_page_with_entities,
     format_entity_line,
     format_entity_detail,
@@ -21,6 +22,9 @@ from formatting import (
 
 logger = logging.getLogger(__name__)
 
+# The main menu never changes, so build it once at import time
+_HELP_LINES = tuple(format_main_menu())
+
 
 class CommandHandler:
     """
@@ -34,6 +38,9 @@ class CommandHandler:
         - Help and system commands
     """
 
+    # Domains whose SET maps to the generic <domain>.set_value service
+    _NUMBER_DOMAINS = frozenset({'input_number', 'number'})
+
     def __init__(
         self,
         ha_client: HomeAssistantClient,
@@ -52,7 +59,39 @@ class CommandHandler:
         self.mapper = entity_mapper
         self.page_size = page_size
 
-    async def handle(self, command: Command) -> List[str]:
+        # (numeric_id, entity) lists for L and A, rebuilt whenever this
+        # handler's mapper changes (its generation moves on, e.g. on REFRESH)
+        self._devices_cache: List[Tuple[int, Dict[str, Any]]] = []
+        self._automations_cache: List[Tuple[int, Dict[str, Any]]] = []
+        # Paginators over those lists, kept so paging N, N, ... reuses them
+        self._devices_pages = Paginator(self._devices_cache, page_size)
+        self._automations_pages = Paginator(self._automations_cache, page_size)
+        self._partition_generation: Optional[int] = None
+
+    def _partition(self) -> None:
+        """Split mapped entities into devices and automations in one pass (no-op while the mapper is unchanged)."""
+        generation = self.mapper.generation
+        if generation == self._partition_generation:
+            return
+
+        devices = []
+        automations = []
+
+        for entity in self.mapper.get_all():
+            entity_id = entity['entity_id']
+            item = (self.mapper.get_id(entity_id), entity)
+            if entity_id.startswith('automation.'):
+                automations.append(item)
+            else:
+                devices.append(item)
+
+        self._devices_cache = devices
+        self._automations_cache = automations
+        self._devices_pages = Paginator(devices, self.page_size)
+        self._automations_pages = Paginator(automations, self.page_size)
+        self._partition_generation = generation
+
+    async def handle(self, command: Command) -> Sequence[str]:
         """
         Execute command and return response lines.
 
@@ -60,52 +99,34 @@ class CommandHandler:
             command: Parsed and validated command
 
         Returns:
-            List of response lines to send to user
+            Response lines to send to user
         """
         try:
-            if command.type == CommandType.LIST:
-                return await self._handle_list(command)
-            elif command.type == CommandType.SHOW:
-                return await self._handle_show(command)
-            elif command.type == CommandType.ON:
-                return await self._handle_on(command)
-            elif command.type == CommandType.OFF:
-                return await self._handle_off(command)
-            elif command.type == CommandType.SET:
-                return await self._handle_set(command)
-            elif command.type == CommandType.AUTOMATIONS:
-                return await self._handle_automations(command)
-            elif command.type == CommandType.TRIGGER:
-                return await self._handle_trigger(command)
-            elif command.type == CommandType.HELP:
-                return self._handle_help(command)
-            elif command.type == CommandType.REFRESH:
-                return await self._handle_refresh(command)
-            elif command.type == CommandType.QUIT:
-                return self._handle_quit(command)
-            else:
-                return format_error_message("Command not implemented")
+            handler = self._ASYNC_DISPATCH.get(command.type)
+            if handler is not None:
+                return await handler(self, command)
+
+            handler = self._SYNC_DISPATCH.get(command.type)
+            if handler is not None:
+                return handler(self, command)
+
+            return format_error_message("Command not implemented")
 
         except Exception as e:
             logger.error(f"Error handling command: {e}", exc_info=True)
             return format_error_message(str(e))
 
-    async def _handle_list(self, command: Command) -> List[str]:
+    async def _handle_list(self, command: Command) -> Sequence[str]:
         """Handle LIST command."""
         page_num = command.page or 1
 
-        # Get all entities from mapper
-        entities = self.mapper.get_all()
+        self._partition()
 
-        if not entities:
+        if not self._devices_cache and not self._automations_cache:
             return format_error_message("No devices found", "Check HA connection")
 
-        # Filter out automations and pair each device with its mapper ID
-        devices = [
-            (self.mapper.get_id(e['entity_id']), e)
-            for e in entities
-            if not e['entity_id'].startswith('automation.')
-        ]
+        # Devices (everything except automations) paired with mapper IDs
+        devices = self._devices_cache
 
         # Format page
         lines, page_info = format_page_with_entities(
@@ -113,12 +134,13 @@ class CommandHandler:
             entity_formatter_func=format_entity_line,
             page_num=page_num,
             page_size=self.page_size,
-            title="DEVICES"
+            title="DEVICES",
+            paginator=self._devices_pages
         )
 
         return lines
 
-    async def _handle_show(self, command: Command) -> List[str]:
+    async def _handle_show(self, command: Command) -> Sequence[str]:
         """Handle SHOW command."""
         entity = self.mapper.get_by_id(command.device_id)
 
@@ -132,49 +154,57 @@ class CommandHandler:
         lines = format_entity_detail(command.device_id, entity)
         return lines
 
-    async def _handle_on(self, command: Command) -> List[str]:
+    async def _handle_on(self, command: Command) -> Sequence[str]:
         """Handle ON command."""
-        entity = self.mapper.get_by_id(command.device_id)
-        entity_id = entity['entity_id']
-        domain = entity_id.split('.')[0]
+        row = self.mapper.get_row(command.device_id)
+        if row is None:
+            return format_error_message(
+                f"Device #{command.device_id} not found",
+                "Use L to list devices"
+            )
+        entity_id = row.entity_id
 
         try:
             await self.ha.turn_on(entity_id)
 
-            # Get friendly name
-            name = entity['attributes'].get('friendly_name', entity_id)
-
             # Use appropriate verb for domain
-            if domain == 'script':
-                return [format_success_message(f"{name} run")]
-            return [format_success_message(f"{name} turned on")]
+            if row.domain == 'script':
+                return (format_success_message(f"{row.friendly_name} run"),)
+            return (format_success_message(f"{row.friendly_name} turned on"),)
 
         except Exception as e:
             logger.error(f"Error turning on {entity_id}: {e}")
             return format_error_message(f"Failed to turn on device", str(e))
 
-    async def _handle_off(self, command: Command) -> List[str]:
+    async def _handle_off(self, command: Command) -> Sequence[str]:
         """Handle OFF command."""
-        entity = self.mapper.get_by_id(command.device_id)
-        entity_id = entity['entity_id']
+        row = self.mapper.get_row(command.device_id)
+        if row is None:
+            return format_error_message(
+                f"Device #{command.device_id} not found",
+                "Use L to list devices"
+            )
+        entity_id = row.entity_id
 
         try:
             await self.ha.turn_off(entity_id)
 
-            # Get friendly name
-            name = entity['attributes'].get('friendly_name', entity_id)
-
-            return [format_success_message(f"{name} turned off")]
+            return (format_success_message(f"{row.friendly_name} turned off"),)
 
         except Exception as e:
             logger.error(f"Error turning off {entity_id}: {e}")
             return format_error_message(f"Failed to turn off device", str(e))
 
-    async def _handle_set(self, command: Command) -> List[str]:
+    async def _handle_set(self, command: Command) -> Sequence[str]:
         """Handle SET command."""
-        entity = self.mapper.get_by_id(command.device_id)
-        entity_id = entity['entity_id']
-        domain = entity_id.split('.')[0]
+        row = self.mapper.get_row(command.device_id)
+        if row is None:
+            return format_error_message(
+                f"Device #{command.device_id} not found",
+                "Use L to list devices"
+            )
+        entity_id = row.entity_id
+        domain = row.domain
 
         try:
             # Handle based on domain
@@ -213,7 +243,7 @@ class CommandHandler:
                     percentage=percentage
                 )
 
-            elif domain in ('input_number', 'number'):
+            elif domain in self._NUMBER_DOMAINS:
                 # Set value
                 value = float(command.value)
                 await self.ha.call_service(
@@ -229,28 +259,20 @@ class CommandHandler:
                     "Use ON/OFF instead"
                 )
 
-            # Get friendly name
-            name = entity['attributes'].get('friendly_name', entity_id)
-
-            return [format_success_message(f"{name} set to {command.value}")]
+            return (format_success_message(f"{row.friendly_name} set to {command.value}"),)
 
         except Exception as e:
             logger.error(f"Error setting {entity_id}: {e}")
             return format_error_message(f"Failed to set device", str(e))
 
-    async def _handle_automations(self, command: Command) -> List[str]:
+    async def _handle_automations(self, command: Command) -> Sequence[str]:
         """Handle AUTOMATIONS command."""
         page_num = command.page or 1
 
-        # Get all entities from mapper
-        entities = self.mapper.get_all()
+        self._partition()
 
-        # Filter for automations only and pair each with its mapper ID
-        automations = [
-            (self.mapper.get_id(e['entity_id']), e)
-            for e in entities
-            if e['entity_id'].startswith('automation.')
-        ]
+        # Automations paired with mapper IDs
+        automations = self._automations_cache
 
         if not automations:
             return format_error_message("No automations found")
@@ -261,48 +283,67 @@ class CommandHandler:
             entity_formatter_func=format_entity_line,
             page_num=page_num,
             page_size=self.page_size,
-            title="AUTOMATIONS"
+            title="AUTOMATIONS",
+            paginator=self._automations_pages
         )
 
         return lines
 
-    async def _handle_trigger(self, command: Command) -> List[str]:
+    async def _handle_trigger(self, command: Command) -> Sequence[str]:
         """Handle TRIGGER command."""
-        entity = self.mapper.get_by_id(command.device_id)
-        entity_id = entity['entity_id']
+        row = self.mapper.get_row(command.device_id)
+        if row is None:
+            return format_error_message(
+                f"Automation #{command.device_id} not found",
+                "Use A to list automations"
+            )
+        entity_id = row.entity_id
 
         try:
             await self.ha.trigger_automation(entity_id)
 
-            # Get friendly name
-            name = entity['attributes'].get('friendly_name', entity_id)
-
-            return [format_success_message(f"{name} triggered")]
+            return (format_success_message(f"{row.friendly_name} triggered"),)
 
         except Exception as e:
             logger.error(f"Error triggering {entity_id}: {e}")
             return format_error_message(f"Failed to trigger automation", str(e))
 
-    def _handle_help(self, command: Command) -> List[str]:
+    def _handle_help(self, command: Command) -> Sequence[str]:
         """Handle HELP command."""
-        return format_main_menu()
+        return _HELP_LINES
 
-    async def _handle_refresh(self, command: Command) -> List[str]:
+    async def _handle_refresh(self, command: Command) -> Sequence[str]:
         """Handle REFRESH command."""
         try:
             # Force cache refresh
             entities = await self.ha.get_states(use_cache=False)
 
-            # Update entity mapper
-            self.mapper.clear()
-            self.mapper.add_entities(entities)
+            # Update entity mapper (existing devices keep their IDs)
+            self.mapper.refresh(entities)
 
-            return [format_success_message(f"Refreshed {len(entities)} entities")]
+            return (format_success_message(f"Refreshed {len(entities)} entities"),)
 
         except Exception as e:
             logger.error(f"Error refreshing: {e}")
             return format_error_message("Failed to refresh", str(e))
 
-    def _handle_quit(self, command: Command) -> List[str]:
+    def _handle_quit(self, command: Command) -> Sequence[str]:
         """Handle QUIT command."""
-        return ["73!"]
+        return ("73!",)
+
+    # Command type -> handler dispatch tables (built once at class creation)
+    _ASYNC_DISPATCH = {
+        CommandType.LIST: _handle_list,
+        CommandType.SHOW: _handle_show,
+        CommandType.ON: _handle_on,
+        CommandType.OFF: _handle_off,
+        CommandType.SET: _handle_set,
+        CommandType.AUTOMATIONS: _handle_automations,
+        CommandType.TRIGGER: _handle_trigger,
+        CommandType.REFRESH: _handle_refresh,
+    }
+
+    _SYNC_DISPATCH = {
+        CommandType.HELP: _handle_help,
+        CommandType.QUIT: _handle_quit,
+    }
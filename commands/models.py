@@ -6,29 +6,65 @@ Data structures for parsed commands.
 
 from dataclasses import dataclass
 from typing import Optional, Any
-from enum import Enum
+from enum import IntEnum
 
 
-class CommandType(Enum):
-    """Command types supported by PacketQTH."""
-    LIST = "list"              # List devices
-    SHOW = "show"              # Show device details
-    ON = "on"                  # Turn on device
-    OFF = "off"                # Turn off device
-    SET = "set"                # Set device value
-    AUTOMATIONS = "automations"  # List automations
-    TRIGGER = "trigger"        # Trigger automation
-    HELP = "help"              # Show help
-    QUIT = "quit"              # Quit session
-    REFRESH = "refresh"        # Refresh cache
-    UNKNOWN = "unknown"        # Unknown command
-
+class CommandType(IntEnum):
+    """
+    Command types supported by PacketQTH.
 
-@dataclass
+    Integer values let the Command predicates below test membership with
+    a single bitmask AND.
+    """
+    LIST = 0           # List devices
+    SHOW = 1           # Show device details
+    ON = 2             # Turn on device
+    OFF = 3            # Turn off device
+    SET = 4            # Set device value
+    AUTOMATIONS = 5    # List automations
+    TRIGGER = 6        # Trigger automation
+    HELP = 7           # Show help
+    QUIT = 8           # Quit session
+    REFRESH = 9        # Refresh cache
+    UNKNOWN = 10       # Unknown command
+
+    @property
+    def label(self) -> str:
+        """Lowercase command name (e.g. 'list')."""
+        return self.name.lower()
+
+
+def _mask(*types: CommandType) -> int:
+    """Build a bitmask with one bit set per command type."""
+    mask = 0
+    for t in types:
+        mask |= 1 << t
+    return mask
+
+
+_REQUIRES_DEVICE_MASK = _mask(
+    CommandType.SHOW,
+    CommandType.ON,
+    CommandType.OFF,
+    CommandType.SET
+)
+_PAGINATED_MASK = _mask(CommandType.LIST, CommandType.AUTOMATIONS)
+_WRITE_MASK = _mask(
+    CommandType.ON,
+    CommandType.OFF,
+    CommandType.SET,
+    CommandType.TRIGGER
+)
+
+
+@dataclass(slots=True, frozen=True)
 class Command:
     """
     Represents a parsed command.
 
+    Frozen: the parser hands out shared instances for argument-free
+    commands, so a Command must never be modified after creation.
+
     Attributes:
         type: Command type
         raw_input: Original input string
@@ -50,12 +86,7 @@ class Command:
 
     def requires_device_id(self) -> bool:
         """Check if command requires a device ID."""
-        return self.type in (
-            CommandType.SHOW,
-            CommandType.ON,
-            CommandType.OFF,
-            CommandType.SET
-        )
+        return bool((1 << self.type) & _REQUIRES_DEVICE_MASK)
 
     def requires_value(self) -> bool:
         """Check if command requires a value parameter."""
@@ -63,7 +94,7 @@ class Command:
 
     def supports_pagination(self) -> bool:
         """Check if command supports pagination."""
-        return self.type in (CommandType.LIST, CommandType.AUTOMATIONS)
+        return bool((1 << self.type) & _PAGINATED_MASK)
 
     def is_write_operation(self) -> bool:
         """
@@ -74,16 +105,11 @@ class Command:
         Returns:
             True if command modifies HomeAssistant state, False otherwise
         """
-        return self.type in (
-            CommandType.ON,
-            CommandType.OFF,
-            CommandType.SET,
-            CommandType.TRIGGER
-        )
+        return bool((1 << self.type) & _WRITE_MASK)
 
     def __str__(self) -> str:
         """String representation of command."""
-        parts = [f"Command({self.type.value}"]
+        parts = [f"Command({self.type.label}"]
 
         if self.device_id is not None:
             parts.append(f"device_id={self.device_id}")
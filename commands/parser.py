@@ -5,10 +5,37 @@ Parse user input into structured Command objects.
 """
 
 import re
-from typing import Optional, List
+from functools import lru_cache, partial
+from typing import Optional
 from .models import Command, CommandType, ParseError
 
 
+def _is_int_literal(value: str) -> bool:
+    """Check if value is an optionally signed run of decimal digits."""
+    digits = value[1:] if value[:1] in ('+', '-') else value
+    return digits.isdecimal()
+
+
+# Command word plus the first two arguments; anything after is ignored.
+# Python's \s is the same whitespace set str.split() uses.
+_COMMAND_RE = re.compile(r'\s*(\S+)(?:\s+(\S+))?(?:\s+(\S+))?').match
+
+
+@lru_cache(maxsize=128)
+def _pooled_command(
+    cmd_type: CommandType,
+    raw_input: str,
+    error: Optional[str] = None
+) -> Command:
+    """
+    Shared Command for argument-free results (H, Q, R, empty input).
+
+    The same (type, raw_input) always yields the same instance; Command is
+    frozen, so sharing it is safe.
+    """
+    return Command(type=cmd_type, raw_input=raw_input, error=error)
+
+
 class CommandParser:
     """
     Parse text commands into Command objects.
@@ -26,6 +53,8 @@ class CommandParser:
         R                - Refresh cache
     """
 
+    __slots__ = ('_dispatch',)
+
     # Command aliases
     COMMAND_MAP = {
         'L': CommandType.LIST,
@@ -51,9 +80,32 @@ class CommandParser:
         'REFRESH': CommandType.REFRESH,
     }
 
+    # Aliases as typically typed (upper, lower, title case) so lookups
+    # rarely need to uppercase the token first
+    _COMMAND_MAP_CI = {
+        variant: cmd_type
+        for alias, cmd_type in COMMAND_MAP.items()
+        for variant in (alias, alias.lower(), alias.title())
+    }
+
     def __init__(self):
         """Initialize parser."""
-        pass
+        # Command type -> bound parse method
+        self._dispatch = {
+            CommandType.LIST: self._parse_list,
+            CommandType.SHOW: partial(self._parse_single_id, CommandType.SHOW, name="SHOW", usage="S <id>"),
+            CommandType.ON: partial(self._parse_single_id, CommandType.ON, name="ON", usage="ON <id>"),
+            CommandType.OFF: partial(self._parse_single_id, CommandType.OFF, name="OFF", usage="OFF <id>"),
+            CommandType.SET: self._parse_set,
+            CommandType.AUTOMATIONS: self._parse_automations,
+            CommandType.TRIGGER: partial(
+                self._parse_single_id, CommandType.TRIGGER,
+                name="TRIGGER", usage="T <id>", label="automation ID"
+            ),
+            CommandType.HELP: self._parse_help,
+            CommandType.QUIT: self._parse_quit,
+            CommandType.REFRESH: self._parse_refresh,
+        }
 
     def parse(self, input_text: str) -> Command:
         """
@@ -68,25 +120,25 @@ class CommandParser:
         # Store original input
         raw_input = input_text
 
-        # Normalize: strip whitespace and convert to uppercase
-        normalized = input_text.strip().upper()
-
-        # Handle empty input
-        if not normalized:
-            return Command(
-                type=CommandType.UNKNOWN,
-                raw_input=raw_input,
-                error="Empty command"
-            )
+        # Bare no-argument commands (H, Q, R, ...) need no tokenizing
+        stripped = input_text.strip()
+        cmd_type = _NOARG_CMDS.get(stripped)
+        if cmd_type is not None:
+            return _pooled_command(cmd_type, raw_input)
 
-        # Split into tokens
-        tokens = normalized.split()
+        # Pull the command word and its first two arguments in one match
+        match = _COMMAND_RE(input_text)
 
-        # First token is the command
-        cmd_token = tokens[0]
+        # Handle empty input
+        if match is None:
+            return _pooled_command(CommandType.UNKNOWN, raw_input, "Empty command")
 
-        # Look up command type
-        cmd_type = self.COMMAND_MAP.get(cmd_token)
+        # First token is the command; only mixed-case input needs normalizing
+        cmd_token, arg1, arg2 = match.groups()
+        cmd_type = self._COMMAND_MAP_CI.get(cmd_token)
+        if cmd_type is None:
+            cmd_token = cmd_token.upper()
+            cmd_type = self.COMMAND_MAP.get(cmd_token)
 
         if cmd_type is None:
             return Command(
@@ -96,33 +148,16 @@ class CommandParser:
             )
 
         # Parse based on command type
+        handler = self._dispatch.get(cmd_type)
+        if handler is None:
+            return Command(
+                type=CommandType.UNKNOWN,
+                raw_input=raw_input,
+                error="Unhandled command type"
+            )
+
         try:
-            if cmd_type == CommandType.LIST:
-                return self._parse_list(tokens, raw_input)
-            elif cmd_type == CommandType.SHOW:
-                return self._parse_show(tokens, raw_input)
-            elif cmd_type == CommandType.ON:
-                return self._parse_on(tokens, raw_input)
-            elif cmd_type == CommandType.OFF:
-                return self._parse_off(tokens, raw_input)
-            elif cmd_type == CommandType.SET:
-                return self._parse_set(tokens, raw_input)
-            elif cmd_type == CommandType.AUTOMATIONS:
-                return self._parse_automations(tokens, raw_input)
-            elif cmd_type == CommandType.TRIGGER:
-                return self._parse_trigger(tokens, raw_input)
-            elif cmd_type == CommandType.HELP:
-                return self._parse_help(tokens, raw_input)
-            elif cmd_type == CommandType.QUIT:
-                return self._parse_quit(tokens, raw_input)
-            elif cmd_type == CommandType.REFRESH:
-                return self._parse_refresh(tokens, raw_input)
-            else:
-                return Command(
-                    type=CommandType.UNKNOWN,
-                    raw_input=raw_input,
-                    error="Unhandled command type"
-                )
+            return handler(arg1, arg2, raw_input)
         except ParseError as e:
             return Command(
                 type=cmd_type,
@@ -130,12 +165,17 @@ class CommandParser:
                 error=str(e)
             )
 
-    def _parse_list(self, tokens: List[str], raw_input: str) -> Command:
+    def _parse_list(
+        self,
+        arg1: Optional[str],
+        arg2: Optional[str],
+        raw_input: str
+    ) -> Command:
         """Parse LIST command: L [page]"""
         page = None
 
-        if len(tokens) > 1:
-            page = self._parse_int(tokens[1], "page number")
+        if arg1 is not None:
+            page = self._parse_int(arg1, "page number")
             if page < 1:
                 raise ParseError("Page number must be >= 1")
 
@@ -145,73 +185,54 @@ class CommandParser:
             page=page
         )
 
-    def _parse_show(self, tokens: List[str], raw_input: str) -> Command:
-        """Parse SHOW command: S <id>"""
-        if len(tokens) < 2:
-            raise ParseError("SHOW requires device ID", "Usage: S <id>")
-
-        device_id = self._parse_int(tokens[1], "device ID")
+    def _parse_single_id(
+        self,
+        cmd_type: CommandType,
+        arg1: Optional[str],
+        arg2: Optional[str],
+        raw_input: str,
+        name: str,
+        usage: str,
+        label: str = "device ID"
+    ) -> Command:
+        """Parse a command taking one ID: S/ON/OFF/T <id>"""
+        if arg1 is None:
+            raise ParseError(f"{name} requires {label}", f"Usage: {usage}")
+
+        device_id = self._parse_int(arg1, label)
 
         if device_id < 1:
-            raise ParseError("Device ID must be >= 1")
+            raise ParseError(f"{label[0].upper()}{label[1:]} must be >= 1")
 
         return Command(
-            type=CommandType.SHOW,
+            type=cmd_type,
             raw_input=raw_input,
             device_id=device_id
         )
 
-    def _parse_on(self, tokens: List[str], raw_input: str) -> Command:
-        """Parse ON command: ON <id>"""
-        if len(tokens) < 2:
-            raise ParseError("ON requires device ID", "Usage: ON <id>")
-
-        device_id = self._parse_int(tokens[1], "device ID")
-
-        if device_id < 1:
-            raise ParseError("Device ID must be >= 1")
-
-        return Command(
-            type=CommandType.ON,
-            raw_input=raw_input,
-            device_id=device_id
-        )
-
-    def _parse_off(self, tokens: List[str], raw_input: str) -> Command:
-        """Parse OFF command: OFF <id>"""
-        if len(tokens) < 2:
-            raise ParseError("OFF requires device ID", "Usage: OFF <id>")
-
-        device_id = self._parse_int(tokens[1], "device ID")
-
-        if device_id < 1:
-            raise ParseError("Device ID must be >= 1")
-
-        return Command(
-            type=CommandType.OFF,
-            raw_input=raw_input,
-            device_id=device_id
-        )
-
-    def _parse_set(self, tokens: List[str], raw_input: str) -> Command:
+    def _parse_set(
+        self,
+        arg1: Optional[str],
+        arg2: Optional[str],
+        raw_input: str
+    ) -> Command:
         """Parse SET command: SET <id> <value>"""
-        if len(tokens) < 3:
+        if arg2 is None:
             raise ParseError(
                 "SET requires device ID and value",
                 "Usage: SET <id> <value>"
             )
 
-        device_id = self._parse_int(tokens[1], "device ID")
+        device_id = self._parse_int(arg1, "device ID")
 
         if device_id < 1:
             raise ParseError("Device ID must be >= 1")
 
         # Try to parse value as number, but allow strings
-        value_str = tokens[2]
-        try:
-            # Try int first
+        value_str = arg2
+        if _is_int_literal(value_str):
             value = int(value_str)
-        except ValueError:
+        else:
             try:
                 # Try float
                 value = float(value_str)
@@ -226,12 +247,17 @@ class CommandParser:
             value=value
         )
 
-    def _parse_automations(self, tokens: List[str], raw_input: str) -> Command:
+    def _parse_automations(
+        self,
+        arg1: Optional[str],
+        arg2: Optional[str],
+        raw_input: str
+    ) -> Command:
         """Parse AUTOMATIONS command: A [page]"""
         page = None
 
-        if len(tokens) > 1:
-            page = self._parse_int(tokens[1], "page number")
+        if arg1 is not None:
+            page = self._parse_int(arg1, "page number")
             if page < 1:
                 raise ParseError("Page number must be >= 1")
 
@@ -241,45 +267,32 @@ class CommandParser:
             page=page
         )
 
-    def _parse_trigger(self, tokens: List[str], raw_input: str) -> Command:
-        """Parse TRIGGER command: T <id>"""
-        if len(tokens) < 2:
-            raise ParseError(
-                "TRIGGER requires automation ID",
-                "Usage: T <id>"
-            )
-
-        device_id = self._parse_int(tokens[1], "automation ID")
-
-        if device_id < 1:
-            raise ParseError("Automation ID must be >= 1")
-
-        return Command(
-            type=CommandType.TRIGGER,
-            raw_input=raw_input,
-            device_id=device_id
-        )
-
-    def _parse_help(self, tokens: List[str], raw_input: str) -> Command:
+    def _parse_help(
+        self,
+        arg1: Optional[str],
+        arg2: Optional[str],
+        raw_input: str
+    ) -> Command:
         """Parse HELP command: H"""
-        return Command(
-            type=CommandType.HELP,
-            raw_input=raw_input
-        )
-
-    def _parse_quit(self, tokens: List[str], raw_input: str) -> Command:
+        return _pooled_command(CommandType.HELP, raw_input)
+
+    def _parse_quit(
+        self,
+        arg1: Optional[str],
+        arg2: Optional[str],
+        raw_input: str
+    ) -> Command:
         """Parse QUIT command: Q"""
-        return Command(
-            type=CommandType.QUIT,
-            raw_input=raw_input
-        )
-
-    def _parse_refresh(self, tokens: List[str], raw_input: str) -> Command:
+        return _pooled_command(CommandType.QUIT, raw_input)
+
+    def _parse_refresh(
+        self,
+        arg1: Optional[str],
+        arg2: Optional[str],
+        raw_input: str
+    ) -> Command:
         """Parse REFRESH command: R"""
-        return Command(
-            type=CommandType.REFRESH,
-            raw_input=raw_input
-        )
+        return _pooled_command(CommandType.REFRESH, raw_input)
 
     def _parse_int(self, value: str, field_name: str) -> int:
         """
@@ -295,10 +308,20 @@ class CommandParser:
         Raises:
             ParseError: If value is not a valid integer
         """
-        try:
+        if _is_int_literal(value):
             return int(value)
-        except ValueError:
-            raise ParseError(f"Invalid {field_name}: {value}")
+        raise ParseError(f"Invalid {field_name}: {value}")
+
+
+# Aliases for commands that take no arguments, checked before tokenizing
+_NOARG_CMDS = {
+    alias: cmd_type
+    for alias, cmd_type in CommandParser._COMMAND_MAP_CI.items()
+    if cmd_type in (CommandType.HELP, CommandType.QUIT, CommandType.REFRESH)
+}
+
+# Parser holds no per-call state, so one shared instance serves every caller
+_DEFAULT_PARSER = CommandParser()
 
 
 def parse_command(input_text: str) -> Command:
@@ -311,5 +334,4 @@ def parse_command(input_text: str) -> Command:
     Returns:
         Command object
     """
-    parser = CommandParser()
-    return parser.parse(input_text)
+    return _DEFAULT_PARSER.parse(input_text)
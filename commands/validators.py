@@ -40,25 +40,27 @@ class CommandValidator:
         - Values are appropriate for entity attributes
     """
 
+    __slots__ = ('entity_mapper',)
+
     # Entities that support turn_on/turn_off
-    SWITCHABLE_DOMAINS = {
+    SWITCHABLE_DOMAINS = frozenset({
         'light',
         'switch',
         'fan',
         'automation',
         'scene',
         'script'
-    }
+    })
 
     # Entities that support set value
-    SETTABLE_DOMAINS = {
+    SETTABLE_DOMAINS = frozenset({
         'light',      # brightness
         'cover',      # position
         'climate',    # temperature
         'fan',        # speed
         'input_number',
         'number'
-    }
+    })
 
     # Attribute names for settable values
     SETTABLE_ATTRIBUTES = {
@@ -70,6 +72,15 @@ class CommandValidator:
         'number': 'state'
     }
 
+    # Accepted SET values: domain -> (min, max, error message, suggestion)
+    VALUE_RANGES = {
+        # Brightness: 0-255 (converted in handler)
+        'light': (0, 255, "Light brightness must be 0-255", "Example: SET 1 128"),
+        'cover': (0, 100, "Cover position must be 0-100", "0=closed, 100=open"),
+        'climate': (-50, 120, "Temperature out of range", "Use degrees F or C"),
+        'fan': (0, 100, "Fan speed must be 0-100", "Example: SET 2 75"),
+    }
+
     def __init__(self, entity_mapper=None):
         """
         Initialize validator.
@@ -107,6 +118,7 @@ class CommandValidator:
 
         # Get entity if command has device_id
         entity = None
+        domain = ''
         if command.device_id is not None:
             entity = self.entity_mapper.get_by_id(command.device_id)
             if not entity:
@@ -114,29 +126,38 @@ class CommandValidator:
                     f"Device #{command.device_id} not found",
                     "Use L to list devices"
                 )
+            # Extract the domain once for all sub-validators
+            domain = entity['entity_id'].partition('.')[0]
 
         # Validate based on command type
         if command.type == CommandType.SHOW:
-            self._validate_show(command, entity)
+            self._validate_show(command, entity, domain)
         elif command.type == CommandType.ON:
-            self._validate_on(command, entity)
+            self._validate_on(command, entity, domain)
         elif command.type == CommandType.OFF:
-            self._validate_off(command, entity)
+            self._validate_off(command, entity, domain)
         elif command.type == CommandType.SET:
-            self._validate_set(command, entity)
+            self._validate_set(command, entity, domain)
         elif command.type == CommandType.TRIGGER:
-            self._validate_trigger(command, entity)
+            self._validate_trigger(command, entity, domain)
 
-    def _validate_show(self, command: Command, entity: Dict[str, Any]) -> None:
+    def _validate_show(
+        self,
+        command: Command,
+        entity: Dict[str, Any],
+        domain: str
+    ) -> None:
         """Validate SHOW command."""
         # SHOW works for any entity
         pass
 
-    def _validate_on(self, command: Command, entity: Dict[str, Any]) -> None:
+    def _validate_on(
+        self,
+        command: Command,
+        entity: Dict[str, Any],
+        domain: str
+    ) -> None:
         """Validate ON command."""
-        entity_id = entity['entity_id']
-        domain = entity_id.split('.')[0]
-
         if domain not in self.SWITCHABLE_DOMAINS:
             entity_type = domain.replace('_', ' ').title()
             raise ValidationError(
@@ -144,11 +165,13 @@ class CommandValidator:
                 f"Use SET to control this device"
             )
 
-    def _validate_off(self, command: Command, entity: Dict[str, Any]) -> None:
+    def _validate_off(
+        self,
+        command: Command,
+        entity: Dict[str, Any],
+        domain: str
+    ) -> None:
         """Validate OFF command."""
-        entity_id = entity['entity_id']
-        domain = entity_id.split('.')[0]
-
         if domain not in self.SWITCHABLE_DOMAINS:
             entity_type = domain.replace('_', ' ').title()
             raise ValidationError(
@@ -156,11 +179,13 @@ class CommandValidator:
                 f"Use SET to control this device"
             )
 
-    def _validate_set(self, command: Command, entity: Dict[str, Any]) -> None:
+    def _validate_set(
+        self,
+        command: Command,
+        entity: Dict[str, Any],
+        domain: str
+    ) -> None:
         """Validate SET command."""
-        entity_id = entity['entity_id']
-        domain = entity_id.split('.')[0]
-
         # Check if domain supports SET
         if domain not in self.SETTABLE_DOMAINS:
             entity_type = domain.replace('_', ' ').title()
@@ -173,11 +198,13 @@ class CommandValidator:
         if command.value is not None:
             self._validate_value_range(domain, command.value, entity)
 
-    def _validate_trigger(self, command: Command, entity: Dict[str, Any]) -> None:
+    def _validate_trigger(
+        self,
+        command: Command,
+        entity: Dict[str, Any],
+        domain: str
+    ) -> None:
         """Validate TRIGGER command."""
-        entity_id = entity['entity_id']
-        domain = entity_id.split('.')[0]
-
         if domain != 'automation':
             raise ValidationError(
                 f"#{command.device_id} is not an automation",
@@ -201,6 +228,11 @@ class CommandValidator:
         Raises:
             ValidationError: If value is out of range
         """
+        # Only some domains have a fixed range
+        value_range = self.VALUE_RANGES.get(domain)
+        if value_range is None:
+            return
+
         # Convert to numeric if possible
         try:
             numeric_value = float(value)
@@ -208,39 +240,9 @@ class CommandValidator:
             # Non-numeric values are allowed for some domains
             return
 
-        # Validate ranges based on domain
-        if domain == 'light':
-            # Brightness: 0-255 or 0-100 depending on interpretation
-            # We'll accept 0-255 and convert in handler
-            if not (0 <= numeric_value <= 255):
-                raise ValidationError(
-                    "Light brightness must be 0-255",
-                    "Example: SET 1 128"
-                )
-
-        elif domain == 'cover':
-            # Position: 0-100
-            if not (0 <= numeric_value <= 100):
-                raise ValidationError(
-                    "Cover position must be 0-100",
-                    "0=closed, 100=open"
-                )
-
-        elif domain == 'climate':
-            # Temperature: reasonable range
-            if not (-50 <= numeric_value <= 120):
-                raise ValidationError(
-                    "Temperature out of range",
-                    "Use degrees F or C"
-                )
-
-        elif domain == 'fan':
-            # Percentage: 0-100
-            if not (0 <= numeric_value <= 100):
-                raise ValidationError(
-                    "Fan speed must be 0-100",
-                    "Example: SET 2 75"
-                )
+        low, high, message, suggestion = value_range
+        if not (low <= numeric_value <= high):
+            raise ValidationError(message, suggestion)
 
 
 def validate_command(command: Command, entity_mapper=None) -> None:
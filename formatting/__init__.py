@@ -23,6 +23,8 @@ from .entities import (
 from .pagination import (
     Paginator,
     paginate_and_format,
+    paginate_and_format_iter,
+    paginate_and_format_bytes,
     format_page_with_entities,
     calculate_optimal_page_size
 )
@@ -32,6 +34,9 @@ from .help import (
     format_main_menu,
     format_command_help,
     format_abbreviations,
+    format_main_menu_bytes,
+    format_command_help_bytes,
+    format_abbreviations_bytes,
     format_error_message,
     format_success_message,
     format_info_message,
@@ -39,6 +44,7 @@ from .help import (
     format_table,
     format_welcome_message,
     format_disconnect_message,
+    format_disconnect_message_bytes,
     format_prompt,
     format_list_header,
     format_compact_list
@@ -60,6 +66,8 @@ __all__ = [
     # Pagination
     'Paginator',
     'paginate_and_format',
+    'paginate_and_format_iter',
+    'paginate_and_format_bytes',
     'format_page_with_entities',
     'calculate_optimal_page_size',
 
@@ -67,6 +75,9 @@ __all__ = [
     'format_main_menu',
     'format_command_help',
     'format_abbreviations',
+    'format_main_menu_bytes',
+    'format_command_help_bytes',
+    'format_abbreviations_bytes',
     'format_error_message',
     'format_success_message',
     'format_info_message',
@@ -74,6 +85,7 @@ __all__ = [
     'format_table',
     'format_welcome_message',
     'format_disconnect_message',
+    'format_disconnect_message_bytes',
     'format_prompt',
     'format_list_header',
     'format_compact_list'
@@ -5,6 +5,8 @@ Format HomeAssistant entities for minimal bandwidth display.
 Optimized for 1200 baud packet radio connections.
 """
 
+import re
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 
 
@@ -25,18 +27,28 @@ ENTITY_ABBREV = {
 }
 
 
+# Decimal / scientific notation as accepted by float() (no inf/nan)
+_is_number = re.compile(
+    r'\s*[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?\s*'
+).fullmatch
+
+
+@lru_cache(maxsize=4096)
 def get_entity_abbrev(entity_id: str) -> str:
     """
     Get abbreviation for entity type.
 
+    Results are memoized per entity_id; ENTITY_ABBREV is treated as
+    constant (call get_entity_abbrev.cache_clear() after changing it).
+
     Args:
         entity_id: Entity ID (e.g., 'light.kitchen')
 
     Returns:
         2-character abbreviation (e.g., 'LT')
     """
-    domain = entity_id.split('.')[0] if '.' in entity_id else ''
-    return ENTITY_ABBREV.get(domain, '??')
+    domain, sep, _ = entity_id.partition('.')
+    return ENTITY_ABBREV.get(domain if sep else '', '??')
 
 
 def format_state(state: str, attributes: Dict[str, Any] = None) -> str:
@@ -66,26 +78,29 @@ def format_state(state: str, attributes: Dict[str, Any] = None) -> str:
         return 'N/A'
 
     # Numeric states (temperature, brightness, position, etc.)
-    try:
-        value = float(state)
+    # Only call float() on states that look numeric, so word states
+    # ('open', 'home', ...) don't each raise and swallow a ValueError
+    if _is_number(state):
+        try:
+            value = float(state)
 
-        # Check for unit of measurement
-        unit = attributes.get('unit_of_measurement', '')
+            # Check for unit of measurement
+            unit = attributes.get('unit_of_measurement', '')
 
-        # Temperature
-        if unit in ('°C', '°F', 'C', 'F'):
-            return f"{int(value)}{unit[0]}"
+            # Temperature
+            if unit in ('°C', '°F', 'C', 'F'):
+                return f"{int(value)}{unit[0]}"
 
-        # Percentage (brightness, position, etc.)
-        elif unit == '%' or 'brightness' in attributes:
-            return f"{int(value)}%"
+            # Percentage (brightness, position, etc.)
+            elif unit == '%' or 'brightness' in attributes:
+                return f"{int(value)}%"
 
-        # Generic number
-        else:
-            return f"{int(value)}"
+            # Generic number
+            else:
+                return f"{int(value)}"
 
-    except (ValueError, TypeError):
-        pass
+        except (ValueError, TypeError):
+            pass
 
     # Long state strings - truncate (use ASCII for packet radio compatibility)
     if len(state) > 6:
@@ -94,6 +109,24 @@ def format_state(state: str, attributes: Dict[str, Any] = None) -> str:
     return state
 
 
+def _entity_line(numeric_id: int, entity: Dict[str, Any], max_name_len: int) -> str:
+    """Build one "<id>.<TYPE> <Name>     <STATE>" line (see format_entity_line)."""
+    entity_id = entity.get('entity_id', 'unknown')
+    attributes = entity.get('attributes', {})
+
+    # Get friendly name or use entity ID
+    name = attributes.get('friendly_name', entity_id.rpartition('.')[2])
+
+    # Truncate name if needed (use ASCII for packet radio compatibility)
+    if len(name) > max_name_len:
+        name = name[:max_name_len - 3] + '...'
+
+    # Build line with padding for alignment
+    # Format: "id.AB Name         [STATE]"
+    state_str = format_state(entity.get('state', 'unknown'), attributes)
+    return f"{numeric_id}.{get_entity_abbrev(entity_id)} {name.ljust(max_name_len)} {state_str}"
+
+
 def format_entity_line(
     numeric_id: int,
     entity: Dict[str, Any],
@@ -113,28 +146,7 @@ def format_entity_line(
     Returns:
         Formatted line string
     """
-    entity_id = entity.get('entity_id', 'unknown')
-    state = entity.get('state', 'unknown')
-    attributes = entity.get('attributes', {})
-
-    # Get friendly name or use entity ID
-    name = attributes.get('friendly_name', entity_id.split('.')[-1])
-
-    # Truncate name if needed (use ASCII for packet radio compatibility)
-    if len(name) > max_name_len:
-        name = name[:max_name_len - 3] + '...'
-
-    # Get abbreviation
-    abbrev = get_entity_abbrev(entity_id)
-
-    # Format state
-    state_str = format_state(state, attributes)
-
-    # Build line with padding for alignment
-    # Format: "id.AB Name         [STATE]"
-    line = f"{numeric_id}.{abbrev} {name:<{max_name_len}} {state_str}"
-
-    return line
+    return _entity_line(numeric_id, entity, max_name_len)
 
 
 def format_entity_list(
@@ -153,13 +165,10 @@ def format_entity_list(
     Returns:
         List of formatted lines
     """
-    lines = []
-
-    for i, entity in enumerate(entities, start=start_id):
-        line = format_entity_line(i, entity, max_name_len)
-        lines.append(line)
-
-    return lines
+    return [
+        _entity_line(numeric_id, entity, max_name_len)
+        for numeric_id, entity in enumerate(entities, start_id)
+    ]
 
 
 def format_entity_detail(
@@ -184,7 +193,7 @@ def format_entity_detail(
 
     # Header
     abbrev = get_entity_abbrev(entity_id)
-    name = attributes.get('friendly_name', entity_id.split('.')[-1])
+    name = attributes.get('friendly_name', entity_id.rpartition('.')[2])
     lines.append(f"#{numeric_id} {abbrev} {name}")
 
     # State
@@ -192,7 +201,7 @@ def format_entity_detail(
     lines.append(f"State: {state_str}")
 
     # Additional attributes based on domain
-    domain = entity_id.split('.')[0] if '.' in entity_id else ''
+    domain = entity_id.partition('.')[0]
 
     if domain == 'light':
         # Brightness
@@ -235,6 +244,19 @@ def format_entity_detail(
     return lines
 
 
+# (label, seconds per byte) at ~10 bits per byte (8 data + start/stop)
+_BAUD_TABLE = (
+    ('300 baud', 10 / 300),    # ~30 bytes/sec
+    ('1200 baud', 10 / 1200),  # ~120 bytes/sec
+    ('9600 baud', 10 / 9600),  # ~960 bytes/sec
+)
+
+
+def _utf8_len(text: str) -> int:
+    """Byte length of text once UTF-8 encoded (no encode needed for ASCII)"""
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
 def format_bandwidth_stats(text: str) -> Dict[str, Any]:
     """
     Calculate bandwidth statistics for text output.
@@ -245,22 +267,16 @@ def format_bandwidth_stats(text: str) -> Dict[str, Any]:
     Returns:
         Dictionary with bandwidth stats
     """
-    byte_count = len(text.encode('utf-8'))
+    byte_count = _utf8_len(text)
     char_count = len(text)
     line_count = text.count('\n') + 1
 
     # Calculate transmission time at different baud rates
-    baud_rates = {
-        '300 baud': 300 / 10,    # ~30 bytes/sec
-        '1200 baud': 1200 / 10,  # ~120 bytes/sec
-        '9600 baud': 9600 / 10,  # ~960 bytes/sec
+    transmission_times = {
+        rate_name: byte_count * secs_per_byte
+        for rate_name, secs_per_byte in _BAUD_TABLE
     }
 
-    transmission_times = {}
-    for rate_name, bytes_per_sec in baud_rates.items():
-        seconds = byte_count / bytes_per_sec
-        transmission_times[rate_name] = seconds
-
     return {
         'bytes': byte_count,
         'characters': char_count,
@@ -280,9 +296,8 @@ def estimate_transmission_time(text: str, baud_rate: int = 1200) -> float:
     Returns:
         Estimated time in seconds
     """
-    byte_count = len(text.encode('utf-8'))
-    bytes_per_sec = baud_rate / 10  # ~10 bits per byte (8 data + start/stop)
-    return byte_count / bytes_per_sec
+    # ~10 bits per byte (8 data + start/stop)
+    return _utf8_len(text) * (10 / baud_rate)
 
 
 def format_compact(items: List[str], separator: str = ' ') -> str:
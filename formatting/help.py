@@ -4,7 +4,120 @@ PacketQTH Help Formatter
 Format help menus and documentation for minimal bandwidth.
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Sequence, Tuple, Optional
+
+
+# Static help text, built once at import time (callers get fresh lists)
+_MAIN_MENU = (
+    "COMMANDS",
+    "L [pg]    List devices",
+    "S <id>    Show device",
+    "ON <id>   Turn on",
+    "OFF <id>  Turn off",
+    "SET <id> <val> Set value",
+    "A [pg]    List automations",
+    "T <id>    Trigger automation",
+    "N / P     Next/prev page",
+    "H         Help (this menu)",
+    "Q         Quit"
+)
+
+_COMMAND_HELP = {
+    'L': (
+        "LIST DEVICES",
+        "Usage: L [page]",
+        "Examples:",
+        "  L       First page",
+        "  L 2     Page 2",
+        "Shows devices with IDs"
+    ),
+    'S': (
+        "SHOW DEVICE",
+        "Usage: S <id>",
+        "Examples:",
+        "  S 1     Show device #1",
+        "Shows detailed info"
+    ),
+    'ON': (
+        "TURN ON",
+        "Usage: ON <id>",
+        "Examples:",
+        "  ON 1    Turn on device #1",
+        "Works with lights, switches"
+    ),
+    'OFF': (
+        "TURN OFF",
+        "Usage: OFF <id>",
+        "Examples:",
+        "  OFF 1   Turn off device #1",
+        "Works with lights, switches"
+    ),
+    'SET': (
+        "SET VALUE",
+        "Usage: SET <id> <value>",
+        "Examples:",
+        "  SET 1 50    Set to 50%",
+        "  SET 2 75    Set to 75",
+        "For: brightness, position, temp"
+    ),
+    'A': (
+        "LIST AUTOMATIONS",
+        "Usage: A [page]",
+        "Examples:",
+        "  A       First page",
+        "  A 2     Page 2",
+        "Shows available automations"
+    ),
+    'T': (
+        "TRIGGER AUTOMATION",
+        "Usage: T <id>",
+        "Examples:",
+        "  T 1     Trigger automation #1",
+        "Runs the automation"
+    ),
+    'Q': (
+        "QUIT",
+        "Usage: Q",
+        "Disconnects from server"
+    )
+}
+
+# Keys as typically typed (upper, lower, title case) so lookups rarely
+# need to uppercase the command first
+_COMMAND_HELP_CI = {
+    variant: lines
+    for key, lines in _COMMAND_HELP.items()
+    for variant in (key, key.lower(), key.title())
+}
+
+_ABBREVIATIONS = (
+    "ABBREVIATIONS",
+    "LT  Light",
+    "SW  Switch",
+    "SN  Sensor",
+    "BL  Blind/Cover",
+    "AU  Automation",
+    "SC  Scene",
+    "CL  Climate",
+    "FN  Fan",
+    "LK  Lock"
+)
+
+
+def _encode_lines(lines: Sequence[str], eol: bytes = b"\r\n") -> bytes:
+    """Encode lines into one block, each terminated by eol."""
+    return b"".join([line.encode('utf-8') + eol for line in lines])
+
+
+# Static help pre-encoded with the telnet session's CRLF line endings
+_MAIN_MENU_BYTES = _encode_lines(_MAIN_MENU)
+_COMMAND_HELP_BYTES = {
+    variant: block
+    for key, block in ((key, _encode_lines(lines)) for key, lines in _COMMAND_HELP.items())
+    for variant in (key, key.lower(), key.title())
+}
+_ABBREVIATIONS_BYTES = _encode_lines(_ABBREVIATIONS)
+_DISCONNECT_BYTES = b"73!\r\n"
 
 
 def format_main_menu() -> List[str]:
@@ -14,19 +127,7 @@ def format_main_menu() -> List[str]:
     Returns:
         List of formatted lines
     """
-    return [
-        "COMMANDS",
-        "L [pg]    List devices",
-        "S <id>    Show device",
-        "ON <id>   Turn on",
-        "OFF <id>  Turn off",
-        "SET <id> <val> Set value",
-        "A [pg]    List automations",
-        "T <id>    Trigger automation",
-        "N / P     Next/prev page",
-        "H         Help (this menu)",
-        "Q         Quit"
-    ]
+    return list(_MAIN_MENU)
 
 
 def format_command_help(command: str) -> List[str]:
@@ -39,68 +140,13 @@ def format_command_help(command: str) -> List[str]:
     Returns:
         List of help lines
     """
-    help_text = {
-        'L': [
-            "LIST DEVICES",
-            "Usage: L [page]",
-            "Examples:",
-            "  L       First page",
-            "  L 2     Page 2",
-            "Shows devices with IDs"
-        ],
-        'S': [
-            "SHOW DEVICE",
-            "Usage: S <id>",
-            "Examples:",
-            "  S 1     Show device #1",
-            "Shows detailed info"
-        ],
-        'ON': [
-            "TURN ON",
-            "Usage: ON <id>",
-            "Examples:",
-            "  ON 1    Turn on device #1",
-            "Works with lights, switches"
-        ],
-        'OFF': [
-            "TURN OFF",
-            "Usage: OFF <id>",
-            "Examples:",
-            "  OFF 1   Turn off device #1",
-            "Works with lights, switches"
-        ],
-        'SET': [
-            "SET VALUE",
-            "Usage: SET <id> <value>",
-            "Examples:",
-            "  SET 1 50    Set to 50%",
-            "  SET 2 75    Set to 75",
-            "For: brightness, position, temp"
-        ],
-        'A': [
-            "LIST AUTOMATIONS",
-            "Usage: A [page]",
-            "Examples:",
-            "  A       First page",
-            "  A 2     Page 2",
-            "Shows available automations"
-        ],
-        'T': [
-            "TRIGGER AUTOMATION",
-            "Usage: T <id>",
-            "Examples:",
-            "  T 1     Trigger automation #1",
-            "Runs the automation"
-        ],
-        'Q': [
-            "QUIT",
-            "Usage: Q",
-            "Disconnects from server"
-        ]
-    }
-
-    cmd_upper = command.upper()
-    return help_text.get(cmd_upper, [f"No help for: {command}"])
+    lines = _COMMAND_HELP_CI.get(command)
+    if lines is None and not command.isupper():
+        # Only unusual casings (e.g. 'sEt') need uppercasing
+        lines = _COMMAND_HELP.get(command.upper())
+    if lines is None:
+        return [f"No help for: {command}"]
+    return list(lines)
 
 
 def format_abbreviations() -> List[str]:
@@ -110,18 +156,57 @@ def format_abbreviations() -> List[str]:
     Returns:
         List of formatted lines
     """
-    return [
-        "ABBREVIATIONS",
-        "LT  Light",
-        "SW  Switch",
-        "SN  Sensor",
-        "BL  Blind/Cover",
-        "AU  Automation",
-        "SC  Scene",
-        "CL  Climate",
-        "FN  Fan",
-        "LK  Lock"
-    ]
+    return list(_ABBREVIATIONS)
+
+
+def format_main_menu_bytes(eol: bytes = b"\r\n") -> bytes:
+    """
+    Main menu as a single pre-encoded block, ready for one socket write.
+
+    Args:
+        eol: Line terminator (default: CRLF)
+
+    Returns:
+        Encoded menu lines, each followed by eol
+    """
+    if eol == b"\r\n":
+        return _MAIN_MENU_BYTES
+    return _encode_lines(_MAIN_MENU, eol)
+
+
+def format_command_help_bytes(command: str, eol: bytes = b"\r\n") -> bytes:
+    """
+    Help for a specific command as a single pre-encoded block.
+
+    Args:
+        command: Command name
+        eol: Line terminator (default: CRLF)
+
+    Returns:
+        Encoded help lines, each followed by eol
+    """
+    if eol == b"\r\n":
+        block = _COMMAND_HELP_BYTES.get(command)
+        if block is None and not command.isupper():
+            block = _COMMAND_HELP_BYTES.get(command.upper())
+        if block is not None:
+            return block
+    return _encode_lines(format_command_help(command), eol)
+
+
+def format_abbreviations_bytes(eol: bytes = b"\r\n") -> bytes:
+    """
+    Abbreviations reference as a single pre-encoded block.
+
+    Args:
+        eol: Line terminator (default: CRLF)
+
+    Returns:
+        Encoded reference lines, each followed by eol
+    """
+    if eol == b"\r\n":
+        return _ABBREVIATIONS_BYTES
+    return _encode_lines(_ABBREVIATIONS, eol)
 
 
 def format_error_message(error: str, context: Optional[str] = None) -> List[str]:
@@ -183,8 +268,9 @@ def format_status_line(
     Returns:
         Formatted status line
     """
-    formatted_items = [f"{key}: {value}" for key, value in items]
-    return separator.join(formatted_items)
+    # str.join() turns any iterable into a list first, so a list
+    # comprehension is cheaper here than a generator expression
+    return separator.join([f"{key}: {value}" for key, value in items])
 
 
 def format_table(
@@ -206,41 +292,39 @@ def format_table(
     if not rows:
         return []
 
-    lines = []
+    # Columns beyond the first row (headers if given) are dropped
+    num_cols = len(headers if headers else rows[0])
+
+    # Compact rows are not padded, so column widths are not needed
+    if compact:
+        return [' '.join(map(str, row[:num_cols])) for row in rows]
 
-    # Calculate column widths
+    # Stringify every cell once, tracking column widths in the same pass
     all_rows = [headers] + rows if headers else rows
-    col_widths = []
+    str_rows = []
+    col_widths = [0] * num_cols
+    for row in all_rows:
+        cells = [str(cell) for cell in row[:num_cols]]
+        for i, cell in enumerate(cells):
+            if len(cell) > col_widths[i]:
+                col_widths[i] = len(cell)
+        str_rows.append(cells)
 
-    if all_rows:
-        num_cols = len(all_rows[0])
-        for col_idx in range(num_cols):
-            max_width = max(len(str(row[col_idx])) for row in all_rows if col_idx < len(row))
-            col_widths.append(max_width)
+    lines = []
 
     # Format header
-    if headers and not compact:
-        header_parts = []
-        for i, header in enumerate(headers):
-            if i < len(col_widths):
-                header_parts.append(header.ljust(col_widths[i]))
-        lines.append(' '.join(header_parts))
+    if headers:
+        lines.append(' '.join([
+            cell.ljust(width) for cell, width in zip(str_rows[0], col_widths)
+        ]))
         lines.append('-' * len(lines[0]))
+        str_rows = str_rows[1:]
 
     # Format rows
-    for row in rows:
-        row_parts = []
-        for i, cell in enumerate(row):
-            if i < len(col_widths):
-                if compact:
-                    row_parts.append(str(cell))
-                else:
-                    row_parts.append(str(cell).ljust(col_widths[i]))
-
-        if compact:
-            lines.append(' '.join(row_parts))
-        else:
-            lines.append(' '.join(row_parts))
+    for cells in str_rows:
+        lines.append(' '.join([
+            cell.ljust(width) for cell, width in zip(cells, col_widths)
+        ]))
 
     return lines
 
@@ -271,6 +355,16 @@ def format_disconnect_message() -> str:
     return "73!"
 
 
+def format_disconnect_message_bytes() -> bytes:
+    """
+    Disconnect message pre-encoded with its CRLF line ending.
+
+    Returns:
+        Encoded farewell line
+    """
+    return _DISCONNECT_BYTES
+
+
 def format_prompt(prompt_char: str = ">") -> str:
     """
     Format command prompt.
@@ -4,8 +4,18 @@ PacketQTH Pagination Formatter
 Handle pagination for large lists with minimal bandwidth.
 """
 
-from typing import List, Dict, Any, Tuple, Optional
-import math
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# Navigation prompts keyed by (compact, has_next, has_prev)
+_NAV_PROMPTS = {
+    (True, True, False): 'N=next',
+    (True, False, True): 'P=prev',
+    (True, True, True): 'N=next P=prev',
+    (False, True, False): '[N]ext',
+    (False, False, True): '[P]rev',
+    (False, True, True): '[N]ext | [P]rev',
+}
 
 
 class Paginator:
@@ -16,22 +26,57 @@ class Paginator:
     - Configurable page size
     - Page navigation (next/prev)
     - Compact page indicators
+    - Lazy mode (Paginator.lazy) that fetches only the requested page
     """
 
-    def __init__(self, items: List[Any], page_size: int = 10):
+    __slots__ = ('items', 'page_size', 'total_items', 'total_pages', '_fetch')
+
+    def __init__(self, items: Sequence[Any], page_size: int = 10):
         """
         Initialize paginator.
 
         Args:
-            items: List of items to paginate
+            items: Items to paginate (list, tuple or other sequence)
             page_size: Items per page (default: 10)
         """
         self.items = items
         self.page_size = page_size
-        self.total_items = len(items)
-        self.total_pages = math.ceil(self.total_items / page_size) if page_size > 0 else 1
+        self._fetch: Optional[Callable[[int, int], Iterable[Any]]] = None
+        self._set_total(len(items))
+
+    @classmethod
+    def lazy(
+        cls,
+        total_items: int,
+        fetch: Callable[[int, int], Iterable[Any]],
+        page_size: int = 10
+    ) -> 'Paginator':
+        """
+        Create a paginator that fetches pages on demand.
+
+        Args:
+            total_items: Total number of items available
+            fetch: Callable (start_index, count) -> items for that range
+            page_size: Items per page (default: 10)
 
-    def get_page(self, page_num: int) -> List[Any]:
+        Returns:
+            Paginator that never holds more than one page of items
+        """
+        paginator = cls([], page_size)
+        paginator._fetch = fetch
+        paginator._set_total(total_items)
+        return paginator
+
+    def _set_total(self, total_items: int):
+        """Set the item count and derived page count."""
+        page_size = self.page_size
+        self.total_items = total_items
+        # Ceiling division without going through float
+        self.total_pages = (
+            (total_items + page_size - 1) // page_size if page_size > 0 else 1
+        )
+
+    def get_page(self, page_num: int) -> Sequence[Any]:
         """
         Get items for a specific page.
 
@@ -39,19 +84,39 @@ class Paginator:
             page_num: Page number (1-indexed)
 
         Returns:
-            List of items for the page
+            Items for the page (a slice of items, or a list when lazy)
         """
-        # Validate page number
-        if page_num < 1:
-            page_num = 1
-        elif page_num > self.total_pages:
-            page_num = self.total_pages
+        start_idx, end_idx = self._slice_bounds(self._clamp_page(page_num))
+        if self._fetch is not None:
+            return list(self._fetch(start_idx, end_idx - start_idx))
+        return self.items[start_idx:end_idx]
 
-        # Calculate slice indices
-        start_idx = (page_num - 1) * self.page_size
-        end_idx = start_idx + self.page_size
+    def iter_page(self, page_num: int) -> Iterator[Any]:
+        """
+        Iterate over the items of a page without copying them.
 
-        return self.items[start_idx:end_idx]
+        Unlike itertools.islice, this indexes the page directly instead of
+        stepping through every item before it.
+
+        Args:
+            page_num: Page number (1-indexed)
+
+        Returns:
+            Iterator over the items for the page
+        """
+        start_idx, end_idx = self._slice_bounds(self._clamp_page(page_num))
+        if self._fetch is not None:
+            return iter(self._fetch(start_idx, end_idx - start_idx))
+        return map(self.items.__getitem__, range(start_idx, end_idx))
+
+    def _clamp_page(self, page_num: int) -> int:
+        """Clamp a page number into 1..total_pages (1 when there are no pages)."""
+        return max(1, min(page_num, self.total_pages))
+
+    def _slice_bounds(self, page_num: int) -> Tuple[int, int]:
+        """Start and end item indices for an already clamped page number."""
+        start_idx = (page_num - 1) * self.page_size
+        return start_idx, min(start_idx + self.page_size, self.total_items)
 
     def get_page_info(self, page_num: int) -> Dict[str, Any]:
         """
@@ -63,11 +128,8 @@ class Paginator:
         Returns:
             Dictionary with page information
         """
-        # Validate page number
-        page_num = max(1, min(page_num, self.total_pages))
-
-        start_idx = (page_num - 1) * self.page_size
-        end_idx = min(start_idx + self.page_size, self.total_items)
+        page_num = self._clamp_page(page_num)
+        start_idx, end_idx = self._slice_bounds(page_num)
 
         return {
             'page_num': page_num,
@@ -98,19 +160,20 @@ class Paginator:
         Returns:
             Formatted page indicator
         """
-        info = self.get_page_info(page_num)
+        page = self._clamp_page(page_num)
 
         if compact:
             # Compact format: "DEVICES (pg 1/3)"
             if prefix:
-                return f"{prefix} (pg {info['page_num']}/{info['total_pages']})"
+                return f"{prefix} (pg {page}/{self.total_pages})"
             else:
-                return f"(pg {info['page_num']}/{info['total_pages']})"
+                return f"(pg {page}/{self.total_pages})"
         else:
             # Verbose format: "Page 1 of 3 (10 items)"
+            start_idx, end_idx = self._slice_bounds(page)
             return (
-                f"Page {info['page_num']} of {info['total_pages']} "
-                f"({info['item_count']} items)"
+                f"Page {page} of {self.total_pages} "
+                f"({end_idx - start_idx} items)"
             )
 
     def format_navigation(self, page_num: int, compact: bool = True) -> Optional[str]:
@@ -127,27 +190,54 @@ class Paginator:
         if self.total_pages <= 1:
             return None
 
-        info = self.get_page_info(page_num)
+        # More than one page means at least one direction is available
+        page = self._clamp_page(page_num)
+        return _NAV_PROMPTS[bool(compact), page < self.total_pages, page > 1]
 
-        nav_options = []
 
-        if info['has_next']:
-            nav_options.append('[N]ext' if not compact else 'N=next')
+def paginate_and_format_iter(
+    items: Sequence[Any],
+    formatter_func,
+    page_num: int = 1,
+    page_size: int = 10,
+    title: str = "",
+    show_nav: bool = True
+) -> Iterator[str]:
+    """
+    Paginate items and yield formatted lines (header, items, navigation).
 
-        if info['has_prev']:
-            nav_options.append('[P]rev' if not compact else 'P=prev')
+    Lines are produced one at a time so a writer can send each as soon as
+    it is formatted, without an intermediate list.
 
-        if not nav_options:
-            return None
+    Args:
+        items: List of items to paginate
+        formatter_func: Function to format each item (takes item, returns string)
+        page_num: Page number to display (default: 1)
+        page_size: Items per page (default: 10)
+        title: Optional title for the page
+        show_nav: Show navigation prompt (default: True)
 
-        if compact:
-            return ' '.join(nav_options)
-        else:
-            return ' | '.join(nav_options)
+    Yields:
+        Formatted lines
+    """
+    paginator = Paginator(items, page_size)
+
+    # Header with page indicator
+    yield paginator.format_page_indicator(page_num, prefix=title, compact=True)
+
+    # Format items
+    for item in paginator.iter_page(page_num):
+        yield formatter_func(item)
+
+    # Add navigation if multiple pages
+    if show_nav and paginator.total_pages > 1:
+        nav = paginator.format_navigation(page_num, compact=True)
+        if nav:
+            yield nav
 
 
 def paginate_and_format(
-    items: List[Any],
+    items: Sequence[Any],
     formatter_func,
     page_num: int = 1,
     page_size: int = 10,
@@ -168,35 +258,60 @@ def paginate_and_format(
     Returns:
         List of formatted lines (header, items, navigation)
     """
-    paginator = Paginator(items, page_size)
-    page_items = paginator.get_page(page_num)
+    return list(paginate_and_format_iter(
+        items, formatter_func, page_num, page_size, title, show_nav
+    ))
 
-    lines = []
 
-    # Add header with page indicator
-    header = paginator.format_page_indicator(page_num, prefix=title, compact=True)
-    lines.append(header)
+def paginate_and_format_bytes(
+    items: Sequence[Any],
+    formatter_func,
+    page_num: int = 1,
+    page_size: int = 10,
+    title: str = "",
+    show_nav: bool = True,
+    eol: bytes = b"\r\n"
+) -> bytes:
+    """
+    Paginate items into one encoded block, for formatters that return bytes.
 
-    # Format items
-    for item in page_items:
-        formatted = formatter_func(item)
-        lines.append(formatted)
+    Item lines are joined as produced, so already-encoded output is never
+    decoded or re-encoded; only the header and navigation are encoded.
+
+    Args:
+        items: Items to paginate
+        formatter_func: Function to format each item (takes item, returns bytes)
+        page_num: Page number to display (default: 1)
+        page_size: Items per page (default: 10)
+        title: Optional title for the page
+        show_nav: Show navigation prompt (default: True)
+        eol: Line terminator appended to every line (default: CRLF)
+
+    Returns:
+        Encoded page (header, items, navigation), each line ending in eol
+    """
+    paginator = Paginator(items, page_size)
+
+    pieces = [paginator.format_page_indicator(page_num, prefix=title).encode('utf-8')]
+    pieces.extend(map(formatter_func, paginator.iter_page(page_num)))
 
-    # Add navigation if multiple pages
     if show_nav and paginator.total_pages > 1:
         nav = paginator.format_navigation(page_num, compact=True)
         if nav:
-            lines.append(nav)
+            pieces.append(nav.encode('utf-8'))
 
-    return lines
+    # Empty final piece gives the last line its terminator
+    pieces.append(b"")
+    return eol.join(pieces)
 
 
 def format_page_with_entities(
-    items: List[Tuple[int, Dict[str, Any]]],
+    items: Sequence[Tuple[int, Dict[str, Any]]],
     entity_formatter_func,
     page_num: int = 1,
     page_size: int = 10,
-    title: str = "DEVICES"
+    title: str = "DEVICES",
+    paginator: Optional[Paginator] = None
 ) -> Tuple[List[str], Dict[str, Any]]:
     """
     Format a page of entities with header and navigation.
@@ -208,12 +323,15 @@ def format_page_with_entities(
         page_num: Page number to display
         page_size: Entities per page
         title: Title for the page
+        paginator: Paginator over items to reuse across pages (default:
+                   build one from items and page_size)
 
     Returns:
         Tuple of (formatted_lines, page_info)
     """
-    paginator = Paginator(items, page_size)
-    page_items = paginator.get_page(page_num)
+    if paginator is None:
+        paginator = Paginator(items, page_size)
+    page_items = paginator.iter_page(page_num)
     page_info = paginator.get_page_info(page_num)
 
     lines = []
@@ -6,15 +6,77 @@ Async HTTP client for HomeAssistant REST API with entity caching and filtering.
 
 import aiohttp
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, timedelta
+import random
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple
 from .filters import EntityFilter, EntityMapper
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+
+    def _json_dumps_sorted(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+except ImportError:  # orjson is optional; stdlib json is just slower
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def _json_dumps_sorted(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True).encode('utf-8')
+
 
 logger = logging.getLogger(__name__)
 
 
+# Above these sizes, JSON parsing and entity filtering run in the default
+# thread pool instead of blocking the event loop
+_OFFLOAD_BYTES = 64 * 1024
+_OFFLOAD_ENTITIES = 256
+
+
+def _parse_body(raw: bytes) -> Any:
+    """
+    Decode a response body.
+
+    Args:
+        raw: Response body
+
+    Returns:
+        Parsed JSON, the body as text if it isn't JSON, or None if empty
+    """
+    if not raw.strip():
+        return None
+    try:
+        return _json_loads(raw)
+    except ValueError:
+        return raw.decode('utf-8', errors='replace')
+
+
+@lru_cache(maxsize=2048)
+def _domain_of(entity_id: str) -> str:
+    """
+    Domain part of an entity_id ('light' for 'light.kitchen').
+
+    Memoized (a deployment has a bounded set of entity IDs) and interned,
+    so repeated service calls reuse one canonical domain string.
+
+    Args:
+        entity_id: Entity ID
+
+    Returns:
+        Text before the first '.', or the whole ID if it has none
+    """
+    return sys.intern(entity_id.partition('.')[0])
+
+
 class HomeAssistantError(Exception):
     """Base exception for HomeAssistant API errors"""
     pass
@@ -35,6 +97,50 @@ class NotFoundError(HomeAssistantError):
     pass
 
 
+class _TransientError(HomeAssistantError):
+    """
+    Internal: a request failure that may succeed if retried.
+
+    Wraps the exception to raise once retries are exhausted.
+    """
+
+    def __init__(
+        self,
+        error: HomeAssistantError,
+        request_sent: bool,
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(str(error))
+        self.error = error
+        # False when no connection was made, so even a POST is safe to repeat
+        self.request_sent = request_sent
+        self.retry_after = retry_after
+
+
+# Responses worth retrying: rate limited, or HomeAssistant (or a proxy in
+# front of it) temporarily unavailable
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds.
+
+    Args:
+        value: Header value, if present
+
+    Returns:
+        Delay in seconds, or None if absent or not a number of seconds
+        (HTTP-date values fall back to the normal backoff)
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
 class HomeAssistantClient:
     """
     Async client for HomeAssistant REST API.
@@ -47,6 +153,32 @@ class HomeAssistantClient:
     - Timeout support
     """
 
+    __slots__ = (
+        'url', 'token', 'entity_filter', 'timeout', 'cache_ttl', 'verify_ssl',
+        'mapper', 'flush_window',
+        '_entity_cache', '_by_domain', '_cache_digest',
+        '_cache_set_at', '_cache_expiry', '_soft_expiry', '_refresh_task',
+        '_inflight_states', '_inflight_state',
+        '_session', '_client_timeout', '_headers',
+        '_pending', '_flush_handles', '_flush_tasks',
+    )
+
+    # Retry policy for transient request failures (see _request)
+    MAX_RETRIES = 3
+    RETRY_BASE_DELAY = 0.5    # seconds, doubled per attempt
+    RETRY_MAX_DELAY = 8.0
+    RETRY_AFTER_MAX = 30.0    # cap on a server-requested Retry-After
+
+    # set_value(): domain -> (service, service data key for the value)
+    _SET_VALUE_DISPATCH = {
+        'light': ('turn_on', 'brightness_pct'),
+        'cover': ('set_cover_position', 'position'),
+        'climate': ('set_temperature', 'temperature'),
+        'fan': ('set_percentage', 'percentage'),
+        'input_number': ('set_value', 'value'),
+        'number': ('set_value', 'value'),
+    }
+
     def __init__(
         self,
         url: str,
@@ -54,7 +186,8 @@ class HomeAssistantClient:
         entity_filter: Optional[EntityFilter] = None,
         timeout: int = 10,
         cache_ttl: int = 60,
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        flush_window_ms: float = 5
     ):
         """
         Initialize HomeAssistant client.
@@ -66,6 +199,9 @@ class HomeAssistantClient:
             timeout: Request timeout in seconds (default: 10)
             cache_ttl: Entity cache time-to-live in seconds (default: 60)
             verify_ssl: Verify SSL certificates (default: True)
+            flush_window_ms: How long service calls wait to be batched with
+                           identical calls for other entities (default: 5,
+                           0 disables batching)
         """
         self.url = url.rstrip('/')
         self.token = token
@@ -76,31 +212,83 @@ class HomeAssistantClient:
 
         # Entity cache
         self._entity_cache: List[Dict[str, Any]] = []
-        self._cache_timestamp: Optional[datetime] = None
+        # Cached entities grouped by domain, rebuilt with the cache
+        self._by_domain: Dict[str, List[Dict[str, Any]]] = {}
+        # Hash of the cached entities' JSON, to detect unchanged refreshes
+        self._cache_digest: Optional[bytes] = None
+        # Monotonic times (immune to wall-clock changes): when the cache was
+        # filled, and when it stops being valid
+        self._cache_set_at: Optional[float] = None
+        self._cache_expiry = 0.0
+
+        # Past the soft expiry (half the TTL) the cache is still served, but
+        # a background refresh is started so callers rarely wait on the API
+        self._soft_expiry = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Fetches currently running; concurrent callers share their result
+        # instead of each requesting the same data
+        self._inflight_states: Optional[asyncio.Task] = None
+        self._inflight_state: Dict[str, asyncio.Task] = {}
 
         # Entity mapper (numeric IDs)
         self.mapper = EntityMapper()
 
-        # HTTP session (created on first use)
+        # HTTP session (created on first use); its settings are built once
+        # here rather than each time the session is recreated
         self._session: Optional[aiohttp.ClientSession] = None
+        self._client_timeout = aiohttp.ClientTimeout(total=timeout)
+        self._headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json'
+        }
+
+        # Service calls waiting to be sent as one request, keyed by
+        # (domain, service, encoded service data)
+        self.flush_window = flush_window_ms / 1000
+        self._pending: Dict[Tuple[str, str, str], List[Tuple[str, asyncio.Future]]] = {}
+        self._flush_handles: Dict[Tuple[str, str, str], asyncio.TimerHandle] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session."""
         if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            connector = aiohttp.TCPConnector(ssl=self.verify_ssl)
+            # Keep idle connections to HomeAssistant open between polls and
+            # cache its DNS lookup, so requests rarely pay for a new
+            # connection; a single host needs only a small pool
+            connector = aiohttp.TCPConnector(
+                ssl=self.verify_ssl,
+                keepalive_timeout=60,
+                limit=32,
+                limit_per_host=8,
+                ttl_dns_cache=300
+            )
             self._session = aiohttp.ClientSession(
-                timeout=timeout,
+                timeout=self._client_timeout,
                 connector=connector,
-                headers={
-                    'Authorization': f'Bearer {self.token}',
-                    'Content-Type': 'application/json'
-                }
+                headers=self._headers
             )
         return self._session
 
     async def close(self):
         """Close HTTP session."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+        # Batches not yet flushed are dropped and their callers failed;
+        # batches already being sent are allowed to finish
+        for handle in self._flush_handles.values():
+            handle.cancel()
+        self._flush_handles.clear()
+        for batch in self._pending.values():
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(HomeAssistantError("Client closed"))
+        self._pending.clear()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
@@ -115,25 +303,31 @@ class HomeAssistantClient:
 
     def _is_cache_valid(self) -> bool:
         """Check if entity cache is still valid."""
-        if not self._cache_timestamp:
-            return False
-
-        age = datetime.now() - self._cache_timestamp
-        return age.total_seconds() < self.cache_ttl
+        return time.monotonic() < self._cache_expiry
 
     async def _request(
         self,
         method: str,
         endpoint: str,
-        json_data: Optional[Dict[str, Any]] = None
+        json_data: Optional[Dict[str, Any]] = None,
+        idempotent: Optional[bool] = None
     ) -> Tuple[int, Any]:
         """
         Make HTTP request to HomeAssistant API.
 
+        Transient failures are retried with exponential backoff and jitter.
+        Idempotent requests (GET by default) are retried on connection
+        errors, timeouts and 429/502/503/504 responses, honouring a
+        Retry-After header. Other requests (e.g. service calls) are only
+        retried when the connection could not be made at all, so an action
+        is never sent twice.
+
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint (e.g., '/api/states')
             json_data: Optional JSON data for POST requests
+            idempotent: Whether the request is safe to repeat
+                       (default: True for GET, False otherwise)
 
         Returns:
             Tuple of (status_code, response_data)
@@ -143,19 +337,66 @@ class HomeAssistantClient:
             AuthenticationError: Invalid token
             HomeAssistantError: Other API errors
         """
+        if idempotent is None:
+            idempotent = method == 'GET'
+
+        attempt = 0
+        while True:
+            try:
+                return await self._request_once(method, endpoint, json_data)
+            except _TransientError as e:
+                if attempt >= self.MAX_RETRIES or (e.request_sent and not idempotent):
+                    raise e.error from None
+
+                if e.retry_after is not None:
+                    delay = min(e.retry_after, self.RETRY_AFTER_MAX)
+                else:
+                    delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt)
+                    delay *= 0.5 + random.random() * 0.5
+
+                attempt += 1
+                logger.warning(
+                    f"{e.error} - retry {attempt}/{self.MAX_RETRIES} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _request_once(
+        self,
+        method: str,
+        endpoint: str,
+        json_data: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Any]:
+        """
+        Make a single HTTP request attempt (see _request).
+
+        Raises:
+            _TransientError: Failure that may succeed if retried
+            AuthenticationError: Invalid token
+            NotFoundError: Resource not found
+            HomeAssistantError: Other API errors
+        """
         url = f"{self.url}{endpoint}"
 
         try:
             session = await self._get_session()
 
-            async with session.request(method, url, json=json_data) as response:
+            # JSON encoded here (Content-Type is a session header) so orjson
+            # can be used when installed
+            body = None if json_data is None else _json_dumps(json_data)
+
+            async with session.request(method, url, data=body) as response:
                 status = response.status
 
-                # Try to parse JSON response
-                try:
-                    data = await response.json()
-                except Exception:
-                    data = await response.text()
+                # Read the body once, then try to parse it as JSON; large
+                # bodies (full state dumps) are parsed on a worker thread so
+                # the event loop keeps serving sessions meanwhile
+                raw = await response.read()
+                if len(raw) > _OFFLOAD_BYTES:
+                    data = await asyncio.get_running_loop().run_in_executor(
+                        None, _parse_body, raw
+                    )
+                else:
+                    data = _parse_body(raw)
 
                 # Handle error status codes
                 if status == 401:
@@ -166,6 +407,19 @@ class HomeAssistantClient:
                     logger.error(f"Not found: {endpoint}")
                     raise NotFoundError(f"Resource not found: {endpoint}")
 
+                elif status in _RETRY_STATUSES:
+                    logger.error(f"API error {status}: {data}")
+                    retry_after = None
+                    if status in (429, 503):
+                        retry_after = _parse_retry_after(
+                            response.headers.get('Retry-After')
+                        )
+                    raise _TransientError(
+                        HomeAssistantError(f"API error {status}: {data}"),
+                        request_sent=True,
+                        retry_after=retry_after
+                    )
+
                 elif status >= 400:
                     logger.error(f"API error {status}: {data}")
                     raise HomeAssistantError(f"API error {status}: {data}")
@@ -174,13 +428,19 @@ class HomeAssistantClient:
 
         except aiohttp.ClientConnectorError as e:
             logger.error(f"Connection failed: {e}")
-            raise ConnectionError(f"Cannot connect to HomeAssistant: {e}")
+            raise _TransientError(
+                ConnectionError(f"Cannot connect to HomeAssistant: {e}"),
+                request_sent=False
+            )
 
         except asyncio.TimeoutError:
             logger.error(f"Request timeout: {endpoint}")
-            raise ConnectionError(f"Request timeout: {endpoint}")
+            raise _TransientError(
+                ConnectionError(f"Request timeout: {endpoint}"),
+                request_sent=True
+            )
 
-        except (AuthenticationError, NotFoundError, HomeAssistantError):
+        except (_TransientError, AuthenticationError, NotFoundError, HomeAssistantError):
             # Re-raise our custom exceptions
             raise
 
@@ -218,11 +478,49 @@ class HomeAssistantClient:
             AuthenticationError: Invalid token
             HomeAssistantError: Other API errors
         """
-        # Return cached entities if valid
+        # Return cached entities if valid, refreshing them in the background
+        # once they are getting old
         if use_cache and self._is_cache_valid():
+            if self._refresh_task is None and time.monotonic() >= self._soft_expiry:
+                self._refresh_task = asyncio.create_task(self._background_refresh())
             logger.debug(f"Using cached entities ({len(self._entity_cache)} entities)")
             return self._entity_cache
 
+        return await self._fetch_states()
+
+    async def _background_refresh(self) -> None:
+        """Refresh the entity cache without a caller waiting on it."""
+        try:
+            await self._fetch_states()
+        except HomeAssistantError as e:
+            # Cache stays as it was; the next call after the hard TTL retries
+            logger.warning(f"Background entity refresh failed: {e}")
+        finally:
+            self._refresh_task = None
+
+    async def _fetch_states(self) -> List[Dict[str, Any]]:
+        """
+        Fetch, filter and cache all entity states.
+
+        Joins a fetch that is already running rather than starting another.
+
+        Returns:
+            List of entity dicts (filtered)
+        """
+        task = self._inflight_states
+        if task is None:
+            task = self._inflight_states = asyncio.ensure_future(self._request_states())
+            task.add_done_callback(self._clear_inflight_states)
+        # Shielded so one cancelled caller doesn't cancel it for the others
+        return await asyncio.shield(task)
+
+    def _clear_inflight_states(self, task: asyncio.Task) -> None:
+        """Forget a finished states fetch."""
+        if self._inflight_states is task:
+            self._inflight_states = None
+
+    async def _request_states(self) -> List[Dict[str, Any]]:
+        """Request /api/states, then filter and cache the result."""
         # Fetch from API
         logger.info("Fetching entities from HomeAssistant")
         status, data = await self._request('GET', '/api/states')
@@ -230,22 +528,51 @@ class HomeAssistantClient:
         if not isinstance(data, list):
             raise HomeAssistantError("Invalid response format: expected list")
 
-        # Apply filters
-        filtered_entities = self.entity_filter.filter_entities(data)
-
-        # Update cache
-        self._entity_cache = filtered_entities
-        self._cache_timestamp = datetime.now()
-
-        # Update mapper
-        self.mapper.refresh(filtered_entities)
+        # Apply filters and fingerprint the result (off the event loop for
+        # large installs)
+        if len(data) > _OFFLOAD_ENTITIES:
+            filtered_entities, digest = await asyncio.get_running_loop().run_in_executor(
+                None, self._filter_and_digest, data
+            )
+        else:
+            filtered_entities, digest = self._filter_and_digest(data)
+
+        # Unchanged since the last fetch (the common case in a quiet home):
+        # keep the current cache, index and mapper and only extend the TTL
+        if digest != self._cache_digest:
+            by_domain: Dict[str, List[Dict[str, Any]]] = {}
+            for entity in filtered_entities:
+                domain, sep, _ = entity.get('entity_id', '').partition('.')
+                if sep:
+                    by_domain.setdefault(domain, []).append(entity)
+            self._entity_cache = filtered_entities
+            self._by_domain = by_domain
+            self._cache_digest = digest
+
+            # Update mapper
+            self.mapper.refresh(filtered_entities)
+
+        self._cache_set_at = time.monotonic()
+        self._cache_expiry = self._cache_set_at + self.cache_ttl
+        self._soft_expiry = self._cache_set_at + self.cache_ttl / 2
 
         logger.info(
             f"Fetched {len(data)} entities, "
-            f"filtered to {len(filtered_entities)}"
+            f"filtered to {len(self._entity_cache)}"
         )
 
-        return filtered_entities
+        return self._entity_cache
+
+    def _filter_and_digest(
+        self,
+        entities: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], bytes]:
+        """Filter entities and hash the result's JSON (safe to run in a thread)."""
+        filtered_entities = self.entity_filter.filter_entities(entities)
+        digest = hashlib.blake2b(
+            _json_dumps_sorted(filtered_entities), digest_size=16
+        ).digest()
+        return filtered_entities, digest
 
     async def get_state(self, entity_id: str) -> Dict[str, Any]:
         """
@@ -262,8 +589,17 @@ class HomeAssistantClient:
             ConnectionError: Failed to connect
             HomeAssistantError: Other API errors
         """
-        logger.debug(f"Getting state for {entity_id}")
-        status, data = await self._request('GET', f'/api/states/{entity_id}')
+        task = self._inflight_state.get(entity_id)
+        if task is None:
+            logger.debug(f"Getting state for {entity_id}")
+            task = self._inflight_state[entity_id] = asyncio.ensure_future(
+                self._request('GET', f'/api/states/{entity_id}')
+            )
+            task.add_done_callback(
+                lambda done: self._inflight_state.pop(entity_id, None)
+            )
+
+        status, data = await asyncio.shield(task)
 
         return data
 
@@ -277,6 +613,12 @@ class HomeAssistantClient:
         """
         Call a HomeAssistant service.
 
+        Calls targeting an entity are held for flush_window so that
+        concurrent calls of the same service with the same data (e.g. a
+        scene switching many lights) go out as one request listing all
+        their entity IDs. Every caller in a batch gets that request's
+        response.
+
         Args:
             domain: Service domain (e.g., 'light', 'switch')
             service: Service name (e.g., 'turn_on', 'turn_off')
@@ -290,6 +632,74 @@ class HomeAssistantClient:
             ConnectionError: Failed to connect
             HomeAssistantError: Service call failed
         """
+        if not entity_id or self.flush_window <= 0:
+            return await self._send_service(domain, service, entity_id, service_data)
+
+        key = (domain, service, json.dumps(service_data, sort_keys=True, default=repr))
+        future = asyncio.get_running_loop().create_future()
+
+        batch = self._pending.get(key)
+        if batch is None:
+            # First call for this key opens the batch and schedules its flush
+            batch = self._pending[key] = []
+            self._flush_handles[key] = asyncio.get_running_loop().call_later(
+                self.flush_window, self._flush_batch, key, service_data
+            )
+        batch.append((entity_id, future))
+
+        return await future
+
+    def _flush_batch(self, key: Tuple[str, str, str], service_data: Dict[str, Any]) -> None:
+        """Send a pending batch (scheduled by call_service)."""
+        del self._flush_handles[key]
+        batch = self._pending.pop(key)
+        task = asyncio.ensure_future(self._send_batch(key[0], key[1], batch, service_data))
+        # Keep a reference until done so the task isn't garbage collected
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_batch(
+        self,
+        domain: str,
+        service: str,
+        batch: List[Tuple[str, asyncio.Future]],
+        service_data: Dict[str, Any]
+    ) -> None:
+        """Send one service request for a batch and resolve its callers."""
+        entity_ids = list(dict.fromkeys(entity_id for entity_id, _ in batch))
+        target = entity_ids[0] if len(entity_ids) == 1 else entity_ids
+
+        try:
+            response = await self._send_service(domain, service, target, service_data)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(response)
+
+    async def _send_service(
+        self,
+        domain: str,
+        service: str,
+        entity_id: Optional[Any],
+        service_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        POST a service call.
+
+        Args:
+            domain: Service domain
+            service: Service name
+            entity_id: Entity ID or list of entity IDs to target (optional)
+            service_data: Additional service data
+
+        Returns:
+            Service call response
+        """
         endpoint = f'/api/services/{domain}/{service}'
 
         # Build service data
@@ -319,7 +729,7 @@ class HomeAssistantClient:
         Returns:
             Service call response
         """
-        domain = entity_id.split('.')[0]
+        domain = _domain_of(entity_id)
         return await self.call_service(domain, 'turn_on', entity_id=entity_id, **kwargs)
 
     async def turn_off(
@@ -337,7 +747,7 @@ class HomeAssistantClient:
         Returns:
             Service call response
         """
-        domain = entity_id.split('.')[0]
+        domain = _domain_of(entity_id)
         return await self.call_service(domain, 'turn_off', entity_id=entity_id, **kwargs)
 
     async def toggle(
@@ -355,7 +765,7 @@ class HomeAssistantClient:
         Returns:
             Service call response
         """
-        domain = entity_id.split('.')[0]
+        domain = _domain_of(entity_id)
         return await self.call_service(domain, 'toggle', entity_id=entity_id, **kwargs)
 
     async def set_value(
@@ -375,30 +785,18 @@ class HomeAssistantClient:
         Returns:
             Service call response
         """
-        domain = entity_id.split('.')[0]
+        domain = _domain_of(entity_id)
 
         # Map value to appropriate service parameter based on domain
-        service_data = kwargs.copy()
-
-        if domain == 'light':
-            service_data['brightness_pct'] = value
-            service = 'turn_on'
-        elif domain == 'cover':
-            service_data['position'] = value
-            service = 'set_cover_position'
-        elif domain == 'climate':
-            service_data['temperature'] = value
-            service = 'set_temperature'
-        elif domain == 'fan':
-            service_data['percentage'] = value
-            service = 'set_percentage'
-        elif domain in ('input_number', 'number'):
-            service_data['value'] = value
-            service = 'set_value'
-        else:
+        entry = self._SET_VALUE_DISPATCH.get(domain)
+        if entry is None:
             raise HomeAssistantError(
                 f"Don't know how to set value for domain '{domain}'"
             )
+        service, param = entry
+
+        service_data = kwargs.copy()
+        service_data[param] = value
 
         return await self.call_service(domain, service, entity_id=entity_id, **service_data)
 
@@ -428,8 +826,7 @@ class HomeAssistantClient:
         Returns:
             List of automation entities
         """
-        entities = await self.get_states(use_cache=use_cache)
-        return [e for e in entities if e.get('entity_id', '').startswith('automation.')]
+        return await self.get_by_domain('automation', use_cache=use_cache)
 
     async def get_by_domain(
         self,
@@ -446,8 +843,8 @@ class HomeAssistantClient:
         Returns:
             List of entities in the specified domain
         """
-        entities = await self.get_states(use_cache=use_cache)
-        return [e for e in entities if e.get('entity_id', '').startswith(f'{domain}.')]
+        await self.get_states(use_cache=use_cache)
+        return list(self._by_domain.get(domain, ()))
 
     async def refresh_cache(self) -> int:
         """
@@ -490,15 +887,17 @@ class HomeAssistantClient:
         Returns:
             Cache age in seconds, or None if no cache
         """
-        if not self._cache_timestamp:
+        if self._cache_set_at is None:
             return None
 
-        age = datetime.now() - self._cache_timestamp
-        return age.total_seconds()
+        return time.monotonic() - self._cache_set_at
 
     def invalidate_cache(self):
         """Invalidate entity cache (force refresh on next get_states())."""
-        self._cache_timestamp = None
+        self._cache_set_at = None
+        self._cache_expiry = 0.0
+        self._soft_expiry = 0.0
+        self._cache_digest = None
         logger.debug("Entity cache invalidated")
 
     @staticmethod
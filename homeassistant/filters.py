@@ -4,8 +4,122 @@ PacketQTH Entity Filters
 Filter HomeAssistant entities by domain, entity ID patterns, and attributes.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
 import fnmatch
+import re
+import sys
+from functools import lru_cache
+
+
+class EntityRow(NamedTuple):
+    """
+    Pre-projected fields of a mapped entity.
+
+    Built once when an entity is added to the mapper so command handlers
+    get everything they read from a single lookup.
+    """
+    entity_id: str
+    friendly_name: str
+    domain: str
+    attributes: Dict[str, Any]
+    raw: Dict[str, Any]
+
+
+def _make_row(entity_id: str, entity: Dict[str, Any]) -> EntityRow:
+    """Project the fields command handlers read from a mapped entity."""
+    attributes = entity.get('attributes') or {}
+    return EntityRow(
+        entity_id=entity_id,
+        friendly_name=attributes.get('friendly_name', entity_id),
+        domain=entity_id.partition('.')[0],
+        attributes=attributes,
+        raw=entity
+    )
+
+
+# Shared stand-in for entities without attributes (never mutated)
+_NO_ATTRIBUTES: Dict[str, Any] = {}
+
+
+def _id_allowed(
+    entity_id: str,
+    included_domains: Optional[FrozenSet[str]],
+    included_re: Optional[Callable[[str], Any]]
+) -> bool:
+    """
+    Check an entity_id against the domain filter and entity allowlist.
+
+    Args:
+        entity_id: Entity ID (e.g., 'light.kitchen')
+        included_domains: Allowed domains, or None/empty for all
+        included_re: Match function for the entity allowlist, or None for all
+
+    Returns:
+        True if the entity_id passes both filters
+    """
+    # Check domain filter ("light" from "light.kitchen", '' without a dot)
+    if included_domains:
+        domain, sep, _ = entity_id.partition('.')
+        if (domain if sep else '') not in included_domains:
+            return False
+
+    # Check included entities allowlist (supports glob patterns)
+    if included_re is not None and not included_re(entity_id):
+        return False
+
+    return True
+
+
+def _has_excluded_attr(
+    entity: Dict[str, Any],
+    excluded_attrs: Tuple[Tuple[str, Any], ...]
+) -> bool:
+    """
+    Check whether an entity has any excluded attribute value.
+
+    Args:
+        entity: Entity dict from HomeAssistant API
+        excluded_attrs: (attribute name, value) pairs that cause exclusion
+
+    Returns:
+        True if the entity should be excluded
+    """
+    attributes = entity.get('attributes') or _NO_ATTRIBUTES
+    for attr_name, excluded_value in excluded_attrs:
+        if attributes.get(attr_name) == excluded_value:
+            return True
+    return False
+
+
+@lru_cache(maxsize=8)
+def _included_domains(domains: FrozenSet[str]) -> Optional[FrozenSet[str]]:
+    """Interned, frozen domain allowlist (None when empty); cached by value."""
+    return frozenset(sys.intern(domain) for domain in domains) if domains else None
+
+
+@lru_cache(maxsize=8)
+def _compile_allowlist(patterns: Tuple[str, ...]) -> Optional[Callable[[str], Any]]:
+    """
+    Fold allowlist glob patterns into one compiled regex match function.
+
+    Cached by the patterns, so reloading an unchanged config (or several
+    filters with the same allowlist) doesn't recompile them. Only the
+    immutable compiled pattern is shared; each EntityFilter has its own state.
+
+    Args:
+        patterns: Entity IDs or glob patterns
+
+    Returns:
+        Match function, or None if there are no patterns
+    """
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns)).match
+
+
+# Upper bound on remembered entity_id verdicts (a real install has far
+# fewer entities; this only guards against unbounded growth)
+_MAX_ID_VERDICTS = 8192
 
 
 class EntityFilter:
@@ -18,6 +132,11 @@ class EntityFilter:
     - Exclude by attribute values
     """
 
+    __slots__ = (
+        'included_domains', 'included_entities', 'excluded_attributes',
+        '_excluded_attrs', '_included_re', '_id_verdicts',
+    )
+
     def __init__(
         self,
         included_domains: Optional[List[str]] = None,
@@ -36,9 +155,19 @@ class EntityFilter:
             excluded_attributes: Dict of attributes that cause exclusion
                                (e.g., {'hidden': True, 'disabled': True})
         """
-        self.included_domains = set(included_domains) if included_domains else None
-        self.included_entities = included_entities or []
-        self.excluded_attributes = excluded_attributes or {}
+        # Immutable after setup; domains interned so equal strings that are
+        # also interned (e.g. identifier-like literals) match by identity
+        self.included_domains = _included_domains(frozenset(included_domains or ()))
+        self.included_entities = list(included_entities or ())
+        self.excluded_attributes = dict(excluded_attributes or {})
+        self._excluded_attrs = tuple(self.excluded_attributes.items())
+
+        # All allowlist patterns folded into one regex, so matching an
+        # entity is a single regex call rather than one fnmatch per pattern
+        self._included_re = _compile_allowlist(tuple(self.included_entities))
+
+        # entity_id -> passes domain filter and allowlist (see filter_entities)
+        self._id_verdicts: Dict[str, bool] = {}
 
     def should_include_entity(self, entity: Dict[str, Any]) -> bool:
         """
@@ -51,44 +180,48 @@ class EntityFilter:
             True if entity should be included, False otherwise
         """
         entity_id = entity.get('entity_id', '')
-        attributes = entity.get('attributes', {})
-
-        # Extract domain from entity_id (e.g., "light" from "light.kitchen")
-        domain = entity_id.split('.')[0] if '.' in entity_id else ''
-
-        # Check domain filter
-        if self.included_domains and domain not in self.included_domains:
+        if not _id_allowed(entity_id, self.included_domains, self._included_re):
             return False
 
-        # Check included entities allowlist (supports glob patterns)
-        # If the list is non-empty, entity must match at least one pattern
-        if self.included_entities:
-            matched = False
-            for pattern in self.included_entities:
-                if fnmatch.fnmatch(entity_id, pattern):
-                    matched = True
-                    break
-            if not matched:
-                return False
-
-        # Check excluded attributes
-        for attr_name, excluded_value in self.excluded_attributes.items():
-            if attributes.get(attr_name) == excluded_value:
-                return False
-
-        return True
+        return not (
+            self._excluded_attrs
+            and _has_excluded_attr(entity, self._excluded_attrs)
+        )
 
     def filter_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Filter a list of entities.
 
+        The domain/allowlist verdict depends only on entity_id, so it is
+        remembered per entity_id: on later refreshes (mostly the same IDs)
+        that part is one dict lookup per entity.
+
         Args:
             entities: List of entity dicts from HomeAssistant API
 
         Returns:
             Filtered list of entities
         """
-        return [entity for entity in entities if self.should_include_entity(entity)]
+        # Filter settings bound once for the whole list
+        included_domains = self.included_domains
+        included_re = self._included_re
+        excluded_attrs = self._excluded_attrs
+
+        verdicts = self._id_verdicts
+        if len(verdicts) > _MAX_ID_VERDICTS:
+            verdicts.clear()
+
+        kept = []
+        for entity in entities:
+            entity_id = entity.get('entity_id', '')
+            allowed = verdicts.get(entity_id)
+            if allowed is None:
+                allowed = verdicts[entity_id] = _id_allowed(
+                    entity_id, included_domains, included_re
+                )
+            if allowed and not (excluded_attrs and _has_excluded_attr(entity, excluded_attrs)):
+                kept.append(entity)
+        return kept
 
     def get_domains(self, entities: List[Dict[str, Any]]) -> List[str]:
         """
@@ -104,7 +237,7 @@ class EntityFilter:
         for entity in entities:
             entity_id = entity.get('entity_id', '')
             if '.' in entity_id:
-                domain = entity_id.split('.')[0]
+                domain = entity_id.partition('.')[0]
                 domains.add(domain)
         return sorted(domains)
 
@@ -142,6 +275,9 @@ class EntityFilter:
             }
         }
 
+        Each call returns a new filter; only its compiled allowlist and
+        domain set are cached (see _compile_allowlist).
+
         Args:
             config: Configuration dictionary
 
@@ -165,11 +301,17 @@ class EntityMapper:
     commands more compact (e.g., "ON 1" instead of "ON light.kitchen").
     """
 
+    __slots__ = ('entity_id_to_id', '_rows', 'generation')
+
     def __init__(self):
         """Initialize entity mapper."""
-        self.id_to_entity: Dict[int, Dict[str, Any]] = {}
+        # entity_id -> numeric ID, plus rows indexed by numeric ID - 1
+        # (None where an entity was removed; IDs are never reused)
         self.entity_id_to_id: Dict[str, int] = {}
-        self._next_id = 1
+        self._rows: List[Optional[EntityRow]] = []
+        # Bumped on every change, so views built from get_all() can tell
+        # when they are stale
+        self.generation = 0
 
     def add_entities(self, entities: List[Dict[str, Any]]) -> None:
         """
@@ -181,22 +323,22 @@ class EntityMapper:
         # Sort entities for consistent ID assignment
         sorted_entities = sorted(entities, key=lambda e: e.get('entity_id', ''))
 
+        ids = self.entity_id_to_id
+        rows = self._rows
         for entity in sorted_entities:
             entity_id = entity.get('entity_id')
             if not entity_id:
                 continue
 
             # Skip if already mapped
-            if entity_id in self.entity_id_to_id:
+            if entity_id in ids:
                 continue
 
-            # Assign numeric ID
-            numeric_id = self._next_id
-            self._next_id += 1
+            # Assign the next numeric ID
+            rows.append(_make_row(entity_id, entity))
+            ids[entity_id] = len(rows)
 
-            # Store mappings
-            self.id_to_entity[numeric_id] = entity
-            self.entity_id_to_id[entity_id] = numeric_id
+        self.generation += 1
 
     def get_by_id(self, numeric_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -208,7 +350,22 @@ class EntityMapper:
         Returns:
             Entity dict or None if not found
         """
-        return self.id_to_entity.get(numeric_id)
+        row = self.get_row(numeric_id)
+        return row.raw if row is not None else None
+
+    def get_row(self, numeric_id: int) -> Optional[EntityRow]:
+        """
+        Get pre-projected entity fields by numeric ID.
+
+        Args:
+            numeric_id: Numeric ID assigned to entity
+
+        Returns:
+            EntityRow or None if not found
+        """
+        if isinstance(numeric_id, int) and 0 < numeric_id <= len(self._rows):
+            return self._rows[numeric_id - 1]
+        return None
 
     def get_id(self, entity_id: str) -> Optional[int]:
         """
@@ -229,25 +386,56 @@ class EntityMapper:
         Returns:
             List of entity dicts sorted by numeric ID
         """
-        return [self.id_to_entity[i] for i in sorted(self.id_to_entity.keys())]
+        return [row.raw for row in self._rows if row is not None]
 
     def clear(self) -> None:
         """Clear all mappings."""
-        self.id_to_entity.clear()
         self.entity_id_to_id.clear()
-        self._next_id = 1
+        self._rows.clear()
+        self.generation += 1
 
     def refresh(self, entities: List[Dict[str, Any]]) -> None:
         """
         Refresh the mapper with new entity list.
 
-        This clears existing mappings and rebuilds from the provided list.
+        Entities that are still present keep their numeric IDs (their
+        entity data is updated in place), entities that disappeared are
+        dropped, and new entities get fresh IDs. A numeric ID a user has
+        already seen therefore never points at a different entity.
 
         Args:
             entities: List of entity dicts from HomeAssistant API
         """
-        self.clear()
-        self.add_entities(entities)
+        current = {}
+        for entity in entities:
+            entity_id = entity.get('entity_id')
+            if entity_id:
+                current[entity_id] = entity
+
+        ids = self.entity_id_to_id
+        rows = self._rows
+
+        # Drop entities that are gone
+        for entity_id in ids.keys() - current.keys():
+            rows[ids.pop(entity_id) - 1] = None
+
+        # Nothing left that a user could still refer to: restart numbering
+        if not ids:
+            rows.clear()
+
+        # Update surviving entities in place, collect the new ones
+        new_entities = []
+        for entity_id, entity in current.items():
+            numeric_id = ids.get(entity_id)
+            if numeric_id is None:
+                new_entities.append(entity)
+            elif rows[numeric_id - 1].raw is not entity:
+                rows[numeric_id - 1] = _make_row(entity_id, entity)
+
+        if new_entities:
+            self.add_entities(new_entities)
+
+        self.generation += 1
 
     def count(self) -> int:
         """
@@ -256,4 +444,4 @@ class EntityMapper:
         Returns:
             Number of mapped entities
         """
-        return len(self.id_to_entity)
+        return len(self.entity_id_to_id)
@@ -13,20 +13,20 @@ import sys
 import os
 from pathlib import Path
 import yaml
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any
 
-# Auth components
-from auth import TOTPAuthenticator, SessionManager
-
-# HomeAssistant components
-from homeassistant.client import HomeAssistantClient
-from homeassistant.filters import EntityFilter, EntityMapper
-
-# Command components
-from commands import CommandHandler
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
 
-# Server components
-from server.telnet import TelnetServer
+# Components are imported in PacketQTH.initialize(), once the config has
+# loaded, so a bad config fails fast without importing aiohttp and friends
+if TYPE_CHECKING:
+    from commands import CommandHandler
+    from homeassistant.client import HomeAssistantClient
+    from homeassistant.filters import EntityMapper
+    from server.telnet import TelnetServer
 
 
 # Configure logging
@@ -40,6 +40,11 @@ except OSError as e:
     # Fall back to stdout-only if the log file can't be opened
     print(f"WARNING: cannot open log file {_log_file!r}: {e} — logging to stdout only", file=sys.stderr)
 
+# The format doesn't use thread/process fields; skip collecting them per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 logging.basicConfig(
     level=_log_level,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -48,7 +53,6 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-
 class PacketQTH:
     """
     Main PacketQTH application.
@@ -70,11 +74,12 @@ class PacketQTH:
         """
         self.config_path = config_path
         self.config: Dict[str, Any] = {}
-        self.server: TelnetServer = None
-        self.ha_client: HomeAssistantClient = None
-        self.entity_mapper: EntityMapper = None
-        self.command_handler: CommandHandler = None
+        self.server: 'TelnetServer' = None
+        self.ha_client: 'HomeAssistantClient' = None
+        self.entity_mapper: 'EntityMapper' = None
+        self.command_handler: 'CommandHandler' = None
         self.running = False
+        self._stopping = False
 
     def load_config(self) -> Dict[str, Any]:
         """
@@ -90,8 +95,9 @@ class PacketQTH:
             sys.exit(1)
 
         try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            # Bytes straight to the (C) loader, no separate decode pass
+            with open(self.config_path, 'rb') as f:
+                config = yaml.load(f, Loader=SafeLoader)
 
             logger.info("Configuration loaded successfully")
             return config
@@ -108,6 +114,7 @@ class PacketQTH:
         self.config = self.load_config()
 
         # Initialize authenticator
+        from auth import TOTPAuthenticator, SessionManager
         users_file = self.config.get('auth', {}).get('users_file', 'users.yaml')
         authenticator = TOTPAuthenticator(users_file)
         session_manager = SessionManager()
@@ -122,6 +129,7 @@ class PacketQTH:
             logger.error("HomeAssistant URL and token required")
             sys.exit(1)
 
+        from homeassistant.client import HomeAssistantClient
         self.ha_client = HomeAssistantClient(
             url=ha_url,
             token=ha_token,
@@ -148,6 +156,7 @@ class PacketQTH:
                 "Run the setup wizard to migrate to the new include_entities format."
             )
 
+        from homeassistant.filters import EntityFilter, EntityMapper
         entity_filter = EntityFilter(
             included_domains=filter_config.get('include_domains'),
             included_entities=filter_config.get('include_entities'),
@@ -163,6 +172,7 @@ class PacketQTH:
         logger.info("Entity mapper initialized")
 
         # Initialize command handler
+        from commands import CommandHandler
         self.command_handler = CommandHandler(
             ha_client=self.ha_client,
             entity_mapper=self.entity_mapper,
@@ -174,6 +184,7 @@ class PacketQTH:
         telnet_config = self.config.get('telnet', {})
         security_config = self.config.get('security', {})
 
+        from server.telnet import TelnetServer
         self.server = TelnetServer(
             host=telnet_config.get('host', '0.0.0.0'),
             port=telnet_config.get('port', 8023),
@@ -214,7 +225,11 @@ class PacketQTH:
         logger.info("=" * 60)
 
     async def stop(self):
-        """Stop the application."""
+        """Stop the application (later calls are no-ops)."""
+        if self._stopping:
+            return
+        self._stopping = True
+
         logger.info("Stopping PacketQTH")
 
         self.running = False
@@ -248,6 +263,9 @@ async def main():
     loop = asyncio.get_running_loop()
 
     def signal_handler():
+        # Repeated SIGTERM/SIGINT while already shutting down: nothing to do
+        if app._stopping or (app.server and app.server.shutdown_event.is_set()):
+            return
         logger.info("Received shutdown signal")
         if app.server:
             app.server.shutdown()  # sets shutdown_event, unblocks serve_forever()
@@ -6,15 +6,63 @@ Manages individual telnet connections with authentication and command processing
 
 import asyncio
 import logging
-from typing import Optional, Callable, Awaitable, TYPE_CHECKING
-from datetime import datetime, timedelta
+import re
+import socket
+import time
+from typing import Optional, Callable, Awaitable, Union
 from auth import TOTPAuthenticator, SessionManager, Session
-
-if TYPE_CHECKING:
-    from commands import CommandHandler
+from commands import (
+    CommandHandler,
+    CommandType,
+    ValidationError,
+    parse_command,
+    validate_command
+)
+from formatting import (
+    format_error_message,
+    format_main_menu_bytes,
+    format_disconnect_message_bytes
+)
 
 logger = logging.getLogger(__name__)
 
+# Fixed prompts and messages, pre-encoded (messages with their CRLF)
+_PROMPT_CALLSIGN = b"Callsign: "
+_PROMPT_TOTP = b"TOTP Code: "
+_PROMPT_CMD = b"> "
+_MSG_CALLSIGN_REQUIRED = b"Callsign required.\r\n"
+_MSG_INVALID_TOTP = b"Invalid code format (must be 6 digits).\r\n"
+_MSG_SESSION_EXPIRED = b"Session expired due to inactivity.\r\n"
+_MSG_CANCELLED = b"Operation cancelled.\r\n"
+_BLANK_LINE = b"\r\n"
+# HELP is answered with the static main menu in one pre-encoded write
+_MAIN_MENU_BYTES = format_main_menu_bytes()
+
+# read_line pulls whatever has arrived (up to this much) per read call
+_READ_SIZE = 4096
+# Bytes read_line must act on: IAC, Ctrl+C, Ctrl+D, LF, CR
+_CONTROL_BYTE = re.compile(rb"[\xff\x03\x04\n\r]")
+
+
+def encode_banner(banner: str) -> bytes:
+    """
+    Encode a welcome banner once for repeated display.
+
+    Args:
+        banner: Banner text (may contain multiple lines)
+
+    Returns:
+        CRLF-framed banner followed by a blank line, or b"" if empty
+    """
+    if not banner:
+        return b""
+    return ("\r\n".join(banner.split('\n')) + "\r\n\r\n").encode('utf-8', errors='replace')
+
+
+def _is_totp_format(code: str) -> bool:
+    """Check for exactly six ASCII digits (str.isdigit alone accepts e.g. '٣')."""
+    return len(code) == 6 and code.isascii() and code.isdigit()
+
 
 class TelnetSession:
     """
@@ -33,7 +81,7 @@ class TelnetSession:
         writer: asyncio.StreamWriter,
         authenticator: TOTPAuthenticator,
         session_manager: SessionManager,
-        command_handler: Optional['CommandHandler'] = None,
+        command_handler: Optional[CommandHandler] = None,
         timeout_seconds: int = 300,
         max_auth_attempts: int = 3,
         bpq_mode: bool = True
@@ -64,17 +112,39 @@ class TelnetSession:
         self.authenticated = False
         self.callsign: Optional[str] = None
         self.session: Optional[Session] = None
-        self.last_activity = datetime.now()
+        # time.monotonic() (the clock asyncio's loop.time() uses): a cheap
+        # float that wall-clock changes can't skew
+        self.last_activity = time.monotonic()
 
         # Pagination state for N/P navigation
         self._last_list_cmd: str = ""  # 'L' or 'A'
         self._last_page: int = 1
 
+        # Bytes received but not yet consumed by read_line
+        self._rbuf = bytearray()
+
         # Connection info
         peername = writer.get_extra_info('peername')
         self.remote_addr = f"{peername[0]}:{peername[1]}" if peername else "unknown"
+        self._tune_transport()
+
+        logger.info("New connection from %s (BPQ mode: %s)", self.remote_addr, bpq_mode)
+
+    def _tune_transport(self):
+        """
+        Tune the connection for small interactive writes.
 
-        logger.info(f"New connection from {self.remote_addr} (BPQ mode: {bpq_mode})")
+        Disables Nagle's algorithm so prompts go out immediately, and sets
+        a zero write-buffer high-water mark so drain() waits until the
+        kernel has taken the bytes.
+        """
+        try:
+            sock = self.writer.get_extra_info('socket')
+            if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.writer.transport.set_write_buffer_limits(high=0)
+        except (AttributeError, OSError) as e:
+            logger.debug("Could not tune transport for %s: %s", self.remote_addr, e)
 
     async def send(self, text: str, newline: bool = True):
         """
@@ -84,94 +154,158 @@ class TelnetSession:
             text: Text to send
             newline: Add CRLF line ending (default: True)
         """
-        if newline:
-            text += "\r\n"
+        data = text.encode('utf-8', errors='replace')
 
         try:
-            self.writer.write(text.encode('utf-8', errors='replace'))
+            if newline:
+                # Hand the transport both pieces rather than concatenating
+                self.writer.writelines((data, _BLANK_LINE))
+            else:
+                self.writer.write(data)
             await self.writer.drain()
-            self.last_activity = datetime.now()
+            self.last_activity = time.monotonic()
         except Exception as e:
-            logger.error(f"Error sending to {self.remote_addr}: {e}")
+            logger.error("Error sending to %s: %s", self.remote_addr, e)
+            raise
+
+    async def send_bytes(self, data: bytes):
+        """
+        Send pre-encoded data to client in a single write.
+
+        Args:
+            data: Bytes to send, including any line endings
+        """
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+            self.last_activity = time.monotonic()
+        except Exception as e:
+            logger.error("Error sending to %s: %s", self.remote_addr, e)
             raise
 
     async def send_lines(self, *lines: str):
         """
-        Send multiple lines of text.
+        Send multiple lines of text in a single write.
 
         Args:
             *lines: Lines to send
         """
-        for line in lines:
-            await self.send(line)
+        if lines:
+            payload = "\r\n".join(lines) + "\r\n"
+            await self.send_bytes(payload.encode('utf-8', errors='replace'))
 
-    async def read_line(self, prompt: str = "", timeout: Optional[int] = None) -> Optional[str]:
+    async def read_line(
+        self,
+        prompt: Union[str, bytes] = "",
+        timeout: Optional[int] = None
+    ) -> Optional[str]:
         """
         Read a line of input from client.
 
         Args:
-            prompt: Optional prompt to display
+            prompt: Optional prompt to display (bytes are written as-is)
             timeout: Read timeout in seconds (uses session timeout if None)
 
         Returns:
             Input line (stripped), '\x03'/'\x04' on interrupt, or None on timeout/disconnect
         """
         if prompt:
-            await self.send(prompt, newline=False)
+            if isinstance(prompt, bytes):
+                await self.send_bytes(prompt)
+            else:
+                await self.send(prompt, newline=False)
 
         timeout_val = timeout or self.timeout_seconds
+        read = self.reader.read
+        loop = asyncio.get_running_loop()
+        rbuf = self._rbuf
         buf = bytearray()
 
         try:
-            while True:
-                b_bytes = await asyncio.wait_for(
-                    self.reader.read(1),
-                    timeout=timeout_val
-                )
-
-                if not b_bytes:
-                    logger.info(f"Connection closed by {self.remote_addr}")
-                    return None
-
-                b = b_bytes[0]
-
-                # Telnet IAC (0xFF) - handle control sequences
-                if b == 0xFF:
-                    cmd = await asyncio.wait_for(self.reader.read(1), timeout=5)
-                    if not cmd:
-                        return None
-                    if cmd[0] == 0xF4:  # IP - Interrupt Process
-                        return '\x03'
-                    # WILL/WONT/DO/DONT - consume the option byte
-                    if cmd[0] in (0xFB, 0xFC, 0xFD, 0xFE):
-                        await asyncio.wait_for(self.reader.read(1), timeout=5)
-                    continue
+            # One timeout handle for the whole line, pushed forward per chunk
+            # (asyncio.wait_for would wrap every read in a new Task)
+            async with asyncio.timeout(timeout_val) as deadline:
+                while True:
+                    if not rbuf:
+                        chunk = await read(_READ_SIZE)
+                        if not chunk:
+                            logger.info("Connection closed by %s", self.remote_addr)
+                            return None
+                        rbuf += chunk
+                        deadline.reschedule(loop.time() + timeout_val)
+
+                    # Copy plain text up to the next control byte in one go
+                    m = _CONTROL_BYTE.search(rbuf)
+                    if m is None:
+                        buf += rbuf
+                        rbuf.clear()
+                        continue
+                    i = m.start()
+                    if i:
+                        buf += rbuf[:i]
+                        del rbuf[:i]
+
+                    b = rbuf[0]
+
+                    # Telnet IAC (0xFF) - handle control sequences
+                    if b == 0xFF:
+                        deadline.reschedule(loop.time() + 5)
+                        if not await self._fill_read_buffer(2):
+                            return None
+                        cmd = rbuf[1]
+                        if cmd == 0xF4:  # IP - Interrupt Process
+                            del rbuf[:2]
+                            return '\x03'
+                        # WILL/WONT/DO/DONT - consume the option byte too
+                        if cmd in (0xFB, 0xFC, 0xFD, 0xFE):
+                            await self._fill_read_buffer(3)
+                            del rbuf[:3]
+                        else:
+                            del rbuf[:2]
+                        deadline.reschedule(loop.time() + timeout_val)
+                        continue
 
-                # Ctrl+C (ETX) or Ctrl+D (EOT) - return immediately without newline
-                if b in (0x03, 0x04):
-                    return chr(b)
+                    del rbuf[:1]
 
-                # LF - end of line
-                if b == 0x0A:
-                    break
+                    # Ctrl+C (ETX) or Ctrl+D (EOT) - return immediately without newline
+                    if b in (0x03, 0x04):
+                        return chr(b)
 
-                # CR - skip (telnet sends CRLF)
-                if b == 0x0D:
-                    continue
+                    # LF - end of line
+                    if b == 0x0A:
+                        break
 
-                buf.append(b)
+                    # CR - skip (telnet sends CRLF)
 
-            self.last_activity = datetime.now()
+            self.last_activity = time.monotonic()
             return buf.decode('utf-8', errors='replace').strip()
 
         except asyncio.TimeoutError:
-            logger.info(f"Timeout waiting for input from {self.remote_addr}")
+            logger.info("Timeout waiting for input from %s", self.remote_addr)
             return None
 
         except Exception as e:
-            logger.error(f"Error reading from {self.remote_addr}: {e}")
+            logger.error("Error reading from %s: %s", self.remote_addr, e)
             return None
 
+    async def _fill_read_buffer(self, size: int) -> bool:
+        """
+        Read until the input buffer holds at least size bytes.
+
+        Args:
+            size: Number of buffered bytes required
+
+        Returns:
+            True if enough bytes are buffered, False on disconnect
+        """
+        rbuf = self._rbuf
+        while len(rbuf) < size:
+            chunk = await self.reader.read(_READ_SIZE)
+            if not chunk:
+                return False
+            rbuf += chunk
+        return True
+
     async def authenticate(self) -> bool:
         """
         Perform TOTP authentication.
@@ -182,55 +316,54 @@ class TelnetSession:
         Returns:
             True if authenticated, False otherwise
         """
-        logger.info(f"Starting authentication for {self.remote_addr}")
+        logger.info("Starting authentication for %s", self.remote_addr)
 
         for attempt in range(1, self.max_auth_attempts + 1):
             # Get callsign
             if self.bpq_mode and attempt == 1:
                 # BPQ mode: read callsign without prompting (BPQ sends it automatically)
-                logger.debug(f"BPQ mode: waiting for callsign from {self.remote_addr}")
+                logger.debug("BPQ mode: waiting for callsign from %s", self.remote_addr)
                 callsign = await self.read_line("", timeout=60)
             else:
                 # Standard mode: prompt for callsign
-                callsign = await self.read_line("Callsign: ", timeout=60)
+                callsign = await self.read_line(_PROMPT_CALLSIGN, timeout=60)
 
             if callsign is None or any(c in callsign for c in ('\x03', '\x04')):
-                logger.info(f"Authentication aborted (no callsign) from {self.remote_addr}")
+                logger.info("Authentication aborted (no callsign) from %s", self.remote_addr)
                 return False
 
-            callsign = callsign.upper().strip()
+            # read_line already strips surrounding whitespace
+            callsign = callsign.upper()
 
             if not callsign:
                 if self.bpq_mode and attempt == 1:
                     # BPQ sent empty line - switch to standard mode and prompt
-                    logger.debug(f"No callsign received in BPQ mode, switching to prompt mode")
+                    logger.debug("No callsign received in BPQ mode, switching to prompt mode")
                     self.bpq_mode = False
-                    callsign = await self.read_line("Callsign: ", timeout=60)
+                    callsign = await self.read_line(_PROMPT_CALLSIGN, timeout=60)
                     if not callsign:
-                        await self.send("Callsign required.")
+                        await self.send_bytes(_MSG_CALLSIGN_REQUIRED)
                         continue
-                    callsign = callsign.upper().strip()
+                    callsign = callsign.upper()
                 else:
-                    await self.send("Callsign required.")
+                    await self.send_bytes(_MSG_CALLSIGN_REQUIRED)
                     continue
 
             # Check if rate limited
             if self.authenticator.is_rate_limited(callsign):
-                logger.warning(f"Rate limited authentication attempt for {callsign} from {self.remote_addr}")
+                logger.warning("Rate limited authentication attempt for %s from %s", callsign, self.remote_addr)
                 await self.send("Too many failed attempts. Try again in 5 minutes.")
                 return False
 
             # Get TOTP code
-            totp_code = await self.read_line("TOTP Code: ", timeout=60)
+            totp_code = await self.read_line(_PROMPT_TOTP, timeout=60)
 
             if totp_code is None or any(c in totp_code for c in ('\x03', '\x04')):
-                logger.info(f"Authentication aborted (no TOTP) for {callsign} from {self.remote_addr}")
+                logger.info("Authentication aborted (no TOTP) for %s from %s", callsign, self.remote_addr)
                 return False
 
-            totp_code = totp_code.strip()
-
-            if not totp_code or len(totp_code) != 6 or not totp_code.isdigit():
-                await self.send("Invalid code format (must be 6 digits).")
+            if not _is_totp_format(totp_code):
+                await self.send_bytes(_MSG_INVALID_TOTP)
                 continue
 
             # Verify TOTP
@@ -243,40 +376,39 @@ class TelnetSession:
                 self.authenticated = True
                 self.callsign = callsign
 
-                logger.info(f"Successful authentication: {callsign} from {self.remote_addr}")
-                await self.send("")
-                await self.send(f"Welcome {callsign}!")
-                await self.send("Type H for help")
-                await self.send("")
+                logger.info("Successful authentication: %s from %s", callsign, self.remote_addr)
+                await self.send_lines("", f"Welcome {callsign}!", "Type H for help", "")
                 return True
 
             else:
                 logger.warning(
-                    f"Failed authentication attempt {attempt}/{self.max_auth_attempts} "
-                    f"for {callsign} from {self.remote_addr}"
+                    "Failed authentication attempt %d/%d for %s from %s",
+                    attempt, self.max_auth_attempts, callsign, self.remote_addr
                 )
                 await self.send(message)
 
                 if attempt < self.max_auth_attempts:
-                    await self.send(f"Try again ({self.max_auth_attempts - attempt} attempts remaining).")
-                    await self.send("")
+                    await self.send_lines(
+                        f"Try again ({self.max_auth_attempts - attempt} attempts remaining).", ""
+                    )
 
         # Max attempts reached
-        logger.warning(f"Max authentication attempts reached from {self.remote_addr}")
+        logger.warning("Max authentication attempts reached from %s", self.remote_addr)
         await self.send("Maximum authentication attempts exceeded.")
         return False
 
-    async def show_banner(self, banner: str):
+    async def show_banner(self, banner: Union[str, bytes]):
         """
         Display welcome banner.
 
         Args:
-            banner: Banner text (may contain multiple lines)
+            banner: Banner text (may contain multiple lines), or bytes
+                already framed by encode_banner()
         """
         if banner:
-            for line in banner.split('\n'):
-                await self.send(line)
-            await self.send("")
+            if isinstance(banner, str):
+                banner = encode_banner(banner)
+            await self.send_bytes(banner)
 
     async def command_loop(self):
         """
@@ -285,28 +417,24 @@ class TelnetSession:
         Reads commands from user and processes them until quit or timeout.
         """
         if not self.authenticated:
-            logger.error(f"Command loop called without authentication from {self.remote_addr}")
+            logger.error("Command loop called without authentication from %s", self.remote_addr)
             return
 
-        logger.info(f"Entering command loop for {self.callsign}")
-
-        # Import here to avoid circular imports
-        from commands import parse_command, validate_command, ValidationError, CommandType
-        from formatting import format_error_message
+        logger.info("Entering command loop for %s", self.callsign)
 
         while True:
             # Check session validity
             if self.session and self.session.is_expired(self.timeout_seconds // 60):
-                logger.info(f"Session expired for {self.callsign}")
-                await self.send("Session expired due to inactivity.")
+                logger.info("Session expired for %s", self.callsign)
+                await self.send_bytes(_MSG_SESSION_EXPIRED)
                 break
 
             # Read command with prompt
-            user_input = await self.read_line("> ")
+            user_input = await self.read_line(_PROMPT_CMD)
 
             if user_input is None:
                 # Timeout or disconnect
-                logger.info(f"Command loop ended for {self.callsign} (timeout/disconnect)")
+                logger.info("Command loop ended for %s (timeout/disconnect)", self.callsign)
                 break
 
             if not user_input:
@@ -315,8 +443,8 @@ class TelnetSession:
 
             # Ctrl+C (ETX \x03) or Ctrl+D (EOT \x04) from telnet client → end session
             if any(c in user_input for c in ('\x03', '\x04')):
-                logger.info(f"Session terminated by {self.callsign} (interrupt character)")
-                await self.send("73!")
+                logger.info("Session terminated by %s (interrupt character)", self.callsign)
+                await self.send_bytes(format_disconnect_message_bytes())
                 break
 
             # Update session activity
@@ -328,15 +456,13 @@ class TelnetSession:
             if upper_input in ('N', 'NEXT'):
                 if not self._last_list_cmd:
                     error_lines = format_error_message("No list active", "Use L or A first")
-                    for line in error_lines:
-                        await self.send(line)
+                    await self.send_lines(*error_lines)
                     continue
                 user_input = f"{self._last_list_cmd} {self._last_page + 1}"
             elif upper_input in ('P', 'PREV', 'PREVIOUS'):
                 if not self._last_list_cmd:
                     error_lines = format_error_message("No list active", "Use L or A first")
-                    for line in error_lines:
-                        await self.send(line)
+                    await self.send_lines(*error_lines)
                     continue
                 user_input = f"{self._last_list_cmd} {max(1, self._last_page - 1)}"
 
@@ -346,46 +472,41 @@ class TelnetSession:
             # Check if command parsed successfully
             if not command.is_valid():
                 error_lines = format_error_message(command.error)
-                for line in error_lines:
-                    await self.send(line)
+                await self.send_lines(*error_lines)
                 continue
 
             # Handle quit command (special case - exit loop)
             if command.type == CommandType.QUIT:
-                logger.info(f"User {self.callsign} quit")
-                await self.send("73!")
+                logger.info("User %s quit", self.callsign)
+                await self.send_bytes(format_disconnect_message_bytes())
                 break
 
             # Check if this is a write operation requiring TOTP
             if command.is_write_operation():
                 # Prompt for fresh TOTP code
-                await self.send("")
-                totp_code = await self.read_line("TOTP Code: ", timeout=60)
+                await self.send_bytes(_BLANK_LINE)
+                totp_code = await self.read_line(_PROMPT_TOTP, timeout=60)
 
                 if totp_code is None or any(c in totp_code for c in ('\x03', '\x04')):
-                    logger.info(f"Write operation aborted (timeout/interrupt) for {self.callsign}")
-                    await self.send("Operation cancelled.")
+                    logger.info("Write operation aborted (timeout/interrupt) for %s", self.callsign)
+                    await self.send_bytes(_MSG_CANCELLED)
                     continue
 
-                totp_code = totp_code.strip()
-
                 # Validate TOTP format
-                if not totp_code or len(totp_code) != 6 or not totp_code.isdigit():
-                    await self.send("Invalid code format (must be 6 digits).")
-                    await self.send("")
+                if not _is_totp_format(totp_code):
+                    await self.send_bytes(_MSG_INVALID_TOTP + _BLANK_LINE)
                     continue
 
                 # Verify TOTP
                 success, message = self.authenticator.verify_totp(self.callsign, totp_code)
 
                 if not success:
-                    logger.warning(f"Failed TOTP verification for write operation by {self.callsign}")
-                    await self.send(message)
-                    await self.send("")
+                    logger.warning("Failed TOTP verification for write operation by %s", self.callsign)
+                    await self.send_lines(message, "")
                     continue
 
                 # TOTP verified - proceed with write operation
-                logger.info(f"TOTP verified for write operation by {self.callsign}")
+                logger.info("TOTP verified for write operation by %s", self.callsign)
 
             # Validate and execute command
             try:
@@ -394,13 +515,17 @@ class TelnetSession:
                     if hasattr(self.command_handler, 'mapper'):
                         validate_command(command, self.command_handler.mapper)
 
-                    # Execute command
-                    response_lines = await self.command_handler.handle(command)
+                    if command.type == CommandType.HELP:
+                        # Static menu: one pre-encoded write (the handler returns
+                        # the same menu as lines for other callers)
+                        await self.send_bytes(_MAIN_MENU_BYTES)
+                    else:
+                        # Execute command
+                        response_lines = await self.command_handler.handle(command)
 
-                    # Send response
-                    if response_lines:
-                        for line in response_lines:
-                            await self.send(line)
+                        # Send response
+                        if response_lines:
+                            await self.send_lines(*response_lines)
 
                     # Track pagination state so N/P can navigate
                     if command.type == CommandType.LIST:
@@ -412,27 +537,25 @@ class TelnetSession:
                 else:
                     # No command handler - show error
                     await self.send("ERR: Command handler not initialized")
-                    logger.error(f"No command handler available for {self.callsign}")
+                    logger.error("No command handler available for %s", self.callsign)
 
             except ValidationError as e:
                 # Command validation failed
                 error_lines = format_error_message(e.message, e.suggestion)
-                for line in error_lines:
-                    await self.send(line)
+                await self.send_lines(*error_lines)
 
             except Exception as e:
                 # Unexpected error
-                logger.error(f"Error processing command '{user_input}' for {self.callsign}: {e}", exc_info=True)
+                logger.error("Error processing command '%s' for %s: %s", user_input, self.callsign, e, exc_info=True)
                 error_lines = format_error_message("Command processing error")
-                for line in error_lines:
-                    await self.send(line)
+                await self.send_lines(*error_lines)
 
-    async def run(self, banner: str = ""):
+    async def run(self, banner: Union[str, bytes] = ""):
         """
         Run the complete session: banner, auth, command loop.
 
         Args:
-            banner: Welcome banner to display
+            banner: Welcome banner to display (text or pre-encoded bytes)
 
         Returns:
             None
@@ -451,7 +574,7 @@ class TelnetSession:
             await self.command_loop()
 
         except Exception as e:
-            logger.error(f"Session error for {self.remote_addr}: {e}")
+            logger.error("Session error for %s: %s", self.remote_addr, e)
 
         finally:
             # Cleanup
@@ -459,7 +582,7 @@ class TelnetSession:
 
     async def close(self):
         """Close the connection and cleanup session."""
-        logger.info(f"Closing connection from {self.remote_addr} (user: {self.callsign or 'unauthenticated'})")
+        logger.info("Closing connection from %s (user: %s)", self.remote_addr, self.callsign or 'unauthenticated')
 
         # End session
         if self.session:
@@ -471,7 +594,7 @@ class TelnetSession:
                 self.writer.close()
                 await self.writer.wait_closed()
         except Exception as e:
-            logger.error(f"Error closing connection: {e}")
+            logger.error("Error closing connection: %s", e)
 
     def is_authenticated(self) -> bool:
         """Check if session is authenticated."""
@@ -492,4 +615,4 @@ class TelnetSession:
         Returns:
             Seconds since last activity
         """
-        return (datetime.now() - self.last_activity).total_seconds()
+        return time.monotonic() - self.last_activity
@@ -12,7 +12,7 @@ from typing import Optional, Callable, Dict, Any, List, Union
 from datetime import datetime
 
 from auth import TOTPAuthenticator, SessionManager
-from .session import TelnetSession
+from .session import TelnetSession, encode_banner
 
 
 logger = logging.getLogger(__name__)
@@ -68,6 +68,7 @@ class TelnetServer:
         self.max_connections = max_connections
         self.timeout_seconds = timeout_seconds
         self.banner = banner
+        self._banner_bytes = encode_banner(banner)
         self.max_auth_attempts = max_auth_attempts
         self.bpq_mode = bpq_mode
 
@@ -186,7 +187,7 @@ class TelnetServer:
 
         try:
             # Run session
-            await session.run(banner=self.banner)
+            await session.run(banner=self._banner_bytes)
 
         except Exception as e:
             logger.error(f"Session error: {e}", exc_info=True)
@@ -4,10 +4,11 @@ Tests for auth/totp.py
 Covers: Session, TOTPAuthenticator, SessionManager
 """
 
+import heapq
 import time
+from collections import deque
 import pytest
 import pyotp
-from datetime import datetime, timedelta
 from unittest.mock import patch
 
 from auth.totp import Session, TOTPAuthenticator, SessionManager
@@ -19,8 +20,8 @@ from auth.totp import Session, TOTPAuthenticator, SessionManager
 
 class TestSession:
     def _make_session(self, last_activity_offset_seconds=0):
-        now = datetime.now()
-        last = now - timedelta(seconds=last_activity_offset_seconds)
+        now = time.monotonic()
+        last = now - last_activity_offset_seconds
         return Session(
             callsign='KN4XYZ',
             authenticated_at=now,
@@ -56,8 +57,8 @@ class TestSession:
     def test_callsign_uppercased_on_creation(self):
         s = Session(
             callsign='KN4XYZ',
-            authenticated_at=datetime.now(),
-            last_activity=datetime.now(),
+            authenticated_at=time.monotonic(),
+            last_activity=time.monotonic(),
             session_id='x'
         )
         assert s.callsign == 'KN4XYZ'
@@ -169,10 +170,18 @@ class TestTOTPAuthenticator:
         auth = TOTPAuthenticator(path)
         # Manually add an old attempt (7 minutes ago)
         old_time = time.time() - 420
-        auth.failed_attempts['KN4XYZ'] = [old_time] * 5
-        # is_rate_limited cleans up old attempts
+        auth.failed_attempts['KN4XYZ'] = deque([old_time] * 5, maxlen=5)
+        # Attempts older than the window do not count
         assert not auth.is_rate_limited('KN4XYZ')
 
+    def test_only_recent_attempts_retained(self, users_yaml):
+        path, _ = users_yaml
+        auth = TOTPAuthenticator(path)
+        for _ in range(20):
+            auth.record_failed_attempt('KN4XYZ')
+        assert len(auth.failed_attempts['KN4XYZ']) == 5
+        assert auth.is_rate_limited('KN4XYZ')
+
     def test_reload_users(self, users_yaml, tmp_path):
         path, secret = users_yaml
         auth = TOTPAuthenticator(path)
@@ -188,6 +197,15 @@ class TestTOTPAuthenticator:
         auth.reload_users()
         assert 'W1NEW' in auth.users
 
+    def test_reload_users_skips_unchanged_file(self, users_yaml):
+        path, _ = users_yaml
+        auth = TOTPAuthenticator(path)
+
+        with patch('auth.totp.yaml.load') as mock_load:
+            auth.reload_users()
+            mock_load.assert_not_called()
+        assert 'KN4XYZ' in auth.users
+
     def test_token_reuse_rejected(self, users_yaml):
         """Same token must be rejected on second use (replay attack prevention)."""
         path, secret = users_yaml
@@ -221,16 +239,77 @@ class TestTOTPAuthenticator:
         assert success
 
     def test_expired_used_tokens_not_blocking(self, users_yaml):
-        """After the validity window expires, a new valid code is accepted normally."""
+        """After the validity window expires, consumed steps are forgotten."""
         path, secret = users_yaml
         auth = TOTPAuthenticator(path)
 
-        # Simulate a previously-used token that has now expired
-        auth.used_tokens['KN4XYZ'] = {'999999': time.time() - 1}
+        # Simulate a previously-used step that has now expired
+        stale = ('KN4XYZ', 1)
+        auth._consumed_steps.add(stale)
+        heapq.heappush(auth._consumed_expiry, (time.time() - 1, stale))
 
         token = pyotp.TOTP(secret).now()
         success, _ = auth.verify_totp('KN4XYZ', token)
         assert success
+        assert stale not in auth._consumed_steps
+
+    def test_expired_step_purged_behind_later_expiry(self, users_yaml):
+        """A step consumed after one that expires later is still purged on time."""
+        path, _ = users_yaml
+        auth = TOTPAuthenticator(path)
+
+        now = time.time()
+        late = ('KN4XYZ', 10)
+        early = ('W1ABC', 1)
+        for expiry, step in ((now + 60, late), (now - 1, early)):
+            auth._consumed_steps.add(step)
+            heapq.heappush(auth._consumed_expiry, (expiry, step))
+
+        auth._purge_consumed_steps(now)
+        assert early not in auth._consumed_steps
+        assert late in auth._consumed_steps
+
+    def test_replay_rejected_for_same_step_different_offset(self, users_yaml):
+        """A code is tracked by its time step, not the wall-clock moment it was sent."""
+        path, secret = users_yaml
+        auth = TOTPAuthenticator(path)
+        now = time.time()
+        token = pyotp.TOTP(secret).at(now)
+
+        with patch('auth.totp.time.time', return_value=now):
+            success1, _ = auth.verify_totp('KN4XYZ', token)
+        with patch('auth.totp.time.time', return_value=now + 60):
+            success2, msg2 = auth.verify_totp('KN4XYZ', token)
+
+        assert success1
+        assert not success2
+        assert 'already used' in msg2.lower()
+
+    def test_verify_accepts_drifted_token_within_window(self, users_yaml):
+        path, secret = users_yaml
+        auth = TOTPAuthenticator(path)
+        token = pyotp.TOTP(secret).at(time.time() - 60)
+        success, _ = auth.verify_totp('KN4XYZ', token)
+        assert success
+
+    def test_verify_rejects_token_outside_window(self, users_yaml):
+        path, secret = users_yaml
+        auth = TOTPAuthenticator(path)
+        token = pyotp.TOTP(secret).at(time.time() - 300)
+        if token in {pyotp.TOTP(secret).at(time.time() + 30 * d) for d in range(-3, 4)}:
+            pytest.skip("Stale code collides with a code inside the window")
+        success, _ = auth.verify_totp('KN4XYZ', token)
+        assert not success
+
+    def test_invalid_secret_is_skipped(self, tmp_path):
+        import yaml
+        path = str(tmp_path / 'users.yaml')
+        with open(path, 'w') as f:
+            yaml.dump({'users': {'KN4XYZ': 'not base32!'}}, f)
+
+        auth = TOTPAuthenticator(path)
+        success, _ = auth.verify_totp('KN4XYZ', '123456')
+        assert not success
 
 
 # ---------------------------------------------------------------------------
@@ -241,8 +320,8 @@ class TestSessionManager:
     def test_create_session(self):
         sm = SessionManager()
         sid = sm.create_session('KN4XYZ')
-        assert sid is not None
-        assert len(sid) == 32  # 16 bytes hex = 32 chars
+        assert isinstance(sid, bytes)
+        assert len(sid) == 16  # 128 random bits
 
     def test_get_valid_session(self):
         sm = SessionManager()
@@ -253,7 +332,7 @@ class TestSessionManager:
 
     def test_get_nonexistent_session(self):
         sm = SessionManager()
-        assert sm.get_session('nonexistent') is None
+        assert sm.get_session(b'nonexistent') is None
 
     def test_end_session(self):
         sm = SessionManager()
@@ -263,7 +342,7 @@ class TestSessionManager:
 
     def test_end_nonexistent_session_is_safe(self):
         sm = SessionManager()
-        sm.end_session('nonexistent')  # should not raise
+        sm.end_session(b'nonexistent')  # should not raise
 
     def test_get_active_sessions(self):
         sm = SessionManager()
@@ -277,15 +356,45 @@ class TestSessionManager:
     def test_cleanup_expired_sessions(self):
         sm = SessionManager(timeout_minutes=1)
         sid = sm.create_session('KN4XYZ')
-        # Manually expire the session
-        sm.sessions[sid].last_activity = datetime.now() - timedelta(minutes=2)
-        sm.cleanup_expired_sessions()
+        # Advance the clock past the timeout
+        later = time.monotonic() + 120
+        with patch('auth.totp.time.monotonic', return_value=later):
+            sm.cleanup_expired_sessions()
         assert sid not in sm.sessions
 
+    def test_cleanup_keeps_recently_active_sessions(self):
+        sm = SessionManager(timeout_minutes=1)
+        idle = sm.create_session('KN4XYZ')
+        active = sm.create_session('W1ABC')
+        start = time.monotonic()
+        with patch('auth.totp.time.monotonic', return_value=start + 50):
+            sm.get_session(active)
+        with patch('auth.totp.time.monotonic', return_value=start + 90):
+            sm.cleanup_expired_sessions()
+        assert idle not in sm.sessions
+        assert active in sm.sessions
+
+    def test_cleanup_after_end_session_is_safe(self):
+        sm = SessionManager(timeout_minutes=1)
+        sid = sm.create_session('KN4XYZ')
+        sm.end_session(sid)
+        later = time.monotonic() + 120
+        with patch('auth.totp.time.monotonic', return_value=later):
+            sm.cleanup_expired_sessions()
+        assert sm.sessions == {}
+
+    def test_expiry_heap_bounded_by_live_sessions(self):
+        sm = SessionManager(timeout_minutes=1)
+        keep = sm.create_session('KN4KEEP')
+        for _ in range(100):
+            sm.end_session(sm.create_session('KN4XYZ'))
+        assert len(sm._expiry_heap) <= 2 * len(sm.sessions)
+        assert keep in {sid for _, sid in sm._expiry_heap}
+
     def test_get_session_auto_cleanup(self):
         sm = SessionManager(timeout_minutes=1)
         sid = sm.create_session('KN4XYZ')
-        sm.sessions[sid].last_activity = datetime.now() - timedelta(minutes=2)
+        sm.sessions[sid].last_activity = time.monotonic() - 120
         result = sm.get_session(sid)
         assert result is None
 
@@ -0,0 +1,245 @@
+"""
+Tests for homeassistant/client.py
+
+Covers: request retry policy (_request), service call batching
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.client import (
+    HomeAssistantClient,
+    HomeAssistantError,
+    ConnectionError,
+    _TransientError,
+)
+
+
+class ScriptedClient(HomeAssistantClient):
+    """
+    Client whose HTTP attempts play back a script of outcomes.
+
+    Each _request_once call pops the next outcome: an exception is raised,
+    anything else is returned. Retry settings are class attributes (the
+    base class uses __slots__, so they can't be set per instance).
+    """
+
+    RETRY_BASE_DELAY = 0.5
+    RETRY_MAX_DELAY = 8.0
+    RETRY_AFTER_MAX = 10.0
+
+    def __init__(self, outcomes, **kwargs):
+        super().__init__('http://ha.local:8123', 'token', **kwargs)
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    async def _request_once(self, method, endpoint, json_data=None):
+        self.calls.append((method, endpoint, json_data))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def transient(request_sent=True, retry_after=None, status=503):
+    return _TransientError(
+        HomeAssistantError(f"API error {status}: unavailable"),
+        request_sent=request_sent,
+        retry_after=retry_after
+    )
+
+
+def connect_failure():
+    return _TransientError(
+        ConnectionError("Cannot connect to HomeAssistant: refused"),
+        request_sent=False
+    )
+
+
+# ---------------------------------------------------------------------------
+# _request retry policy
+# ---------------------------------------------------------------------------
+
+class TestRequestRetry:
+    @pytest.mark.asyncio
+    async def test_success_needs_one_attempt(self):
+        client = ScriptedClient([(200, {'ok': True})])
+        assert await client._request('GET', '/api/') == (200, {'ok': True})
+        assert len(client.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_sent_post_is_not_retried(self):
+        client = ScriptedClient([transient(), (200, [])])
+        with patch('asyncio.sleep', new=AsyncMock()) as sleep:
+            with pytest.raises(HomeAssistantError):
+                await client._request('POST', '/api/services/automation/trigger', {})
+        assert len(client.calls) == 1
+        sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_retried_max_times_then_raises_wrapped_error(self):
+        outcomes = [transient() for _ in range(ScriptedClient.MAX_RETRIES + 1)]
+        client = ScriptedClient(outcomes)
+        with patch('asyncio.sleep', new=AsyncMock()) as sleep:
+            with pytest.raises(HomeAssistantError) as exc_info:
+                await client._request('GET', '/api/states')
+        assert not isinstance(exc_info.value, _TransientError)
+        assert 'API error 503' in str(exc_info.value)
+        assert len(client.calls) == ScriptedClient.MAX_RETRIES + 1
+        assert sleep.await_count == ScriptedClient.MAX_RETRIES
+
+    @pytest.mark.asyncio
+    async def test_get_succeeds_after_transient_failure(self):
+        client = ScriptedClient([transient(), (200, [])])
+        with patch('asyncio.sleep', new=AsyncMock()):
+            assert await client._request('GET', '/api/states') == (200, [])
+        assert len(client.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_backoff_is_bounded_with_jitter(self):
+        outcomes = [transient() for _ in range(ScriptedClient.MAX_RETRIES)] + [(200, [])]
+        client = ScriptedClient(outcomes)
+        with patch('asyncio.sleep', new=AsyncMock()) as sleep:
+            await client._request('GET', '/api/states')
+        delays = [call.args[0] for call in sleep.await_args_list]
+        for attempt, delay in enumerate(delays):
+            full = min(ScriptedClient.RETRY_MAX_DELAY, ScriptedClient.RETRY_BASE_DELAY * 2 ** attempt)
+            assert full / 2 <= delay <= full
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('status', [429, 503])
+    async def test_retry_after_used_as_delay(self, status):
+        client = ScriptedClient([transient(retry_after=2.0, status=status), (200, [])])
+        with patch('asyncio.sleep', new=AsyncMock()) as sleep:
+            await client._request('GET', '/api/states')
+        sleep.assert_awaited_once_with(2.0)
+
+    @pytest.mark.asyncio
+    async def test_retry_after_capped(self):
+        client = ScriptedClient([transient(retry_after=600.0, status=429), (200, [])])
+        with patch('asyncio.sleep', new=AsyncMock()) as sleep:
+            await client._request('GET', '/api/states')
+        sleep.assert_awaited_once_with(ScriptedClient.RETRY_AFTER_MAX)
+
+    @pytest.mark.asyncio
+    async def test_connect_failure_retries_post(self):
+        client = ScriptedClient([connect_failure(), (200, [])])
+        with patch('asyncio.sleep', new=AsyncMock()):
+            result = await client._request('POST', '/api/services/light/turn_on', {})
+        assert result == (200, [])
+        assert len(client.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_connect_failure_raises_connection_error_when_exhausted(self):
+        outcomes = [connect_failure() for _ in range(ScriptedClient.MAX_RETRIES + 1)]
+        client = ScriptedClient(outcomes)
+        with patch('asyncio.sleep', new=AsyncMock()):
+            with pytest.raises(ConnectionError):
+                await client._request('POST', '/api/services/light/turn_on', {})
+
+    @pytest.mark.asyncio
+    async def test_non_transient_error_not_retried(self):
+        client = ScriptedClient([HomeAssistantError("API error 400: bad"), (200, [])])
+        with pytest.raises(HomeAssistantError):
+            await client._request('GET', '/api/states')
+        assert len(client.calls) == 1
+
+
+# ---------------------------------------------------------------------------
+# Service call batching
+# ---------------------------------------------------------------------------
+
+class RecordingClient(HomeAssistantClient):
+    """Client that records service POSTs instead of sending them."""
+
+    def __init__(self, error=None, delay=0.0, **kwargs):
+        super().__init__('http://ha.local:8123', 'token', **kwargs)
+        self.sent = []
+        self.error = error
+        self.delay = delay
+
+    async def _send_service(self, domain, service, entity_id, service_data):
+        self.sent.append((domain, service, entity_id, dict(service_data)))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [{'entity_id': entity_id}]
+
+
+class TestServiceBatching:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_become_one_request(self):
+        client = RecordingClient()
+        r1, r2 = await asyncio.gather(
+            client.turn_on('light.kitchen'),
+            client.turn_on('light.bedroom'),
+        )
+        assert client.sent == [
+            ('light', 'turn_on', ['light.kitchen', 'light.bedroom'], {})
+        ]
+        assert r1 == r2
+
+    @pytest.mark.asyncio
+    async def test_single_call_targets_plain_entity_id(self):
+        client = RecordingClient()
+        await client.turn_on('light.kitchen')
+        assert client.sent == [('light', 'turn_on', 'light.kitchen', {})]
+
+    @pytest.mark.asyncio
+    async def test_different_service_data_not_merged(self):
+        client = RecordingClient()
+        await asyncio.gather(
+            client.turn_on('light.kitchen', brightness_pct=10),
+            client.turn_on('light.bedroom', brightness_pct=90),
+        )
+        assert sorted(client.sent) == [
+            ('light', 'turn_on', 'light.bedroom', {'brightness_pct': 90}),
+            ('light', 'turn_on', 'light.kitchen', {'brightness_pct': 10}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_waiter(self):
+        client = RecordingClient(error=ConnectionError("down"))
+        results = await asyncio.gather(
+            client.turn_on('light.kitchen'),
+            client.turn_on('light.bedroom'),
+            return_exceptions=True,
+        )
+        assert len(client.sent) == 1
+        assert all(isinstance(r, ConnectionError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_zero_window_bypasses_batching(self):
+        client = RecordingClient(flush_window_ms=0)
+        await asyncio.gather(
+            client.turn_on('light.kitchen'),
+            client.turn_on('light.bedroom'),
+        )
+        assert sorted(entity for _, _, entity, _ in client.sent) == [
+            'light.bedroom', 'light.kitchen'
+        ]
+        assert client._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_close_fails_unflushed_batch(self):
+        client = RecordingClient(flush_window_ms=50)
+        call = asyncio.ensure_future(client.turn_on('light.kitchen'))
+        await asyncio.sleep(0)
+        await client.close()
+        with pytest.raises(HomeAssistantError):
+            await call
+        await asyncio.sleep(0.1)
+        assert client.sent == []
+        assert client._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_batch_being_sent(self):
+        client = RecordingClient(flush_window_ms=1, delay=0.05)
+        call = asyncio.ensure_future(client.turn_on('light.kitchen'))
+        await asyncio.sleep(0.01)
+        assert client._flush_tasks
+        await client.close()
+        assert not client._flush_tasks
+        assert await call == [{'entity_id': 'light.kitchen'}]
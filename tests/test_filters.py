@@ -54,6 +54,14 @@ class TestEntityFilter:
         assert ef.should_include_entity(make_entity('light.kitchen'))
         assert not ef.should_include_entity(make_entity('sensor.temp'))
 
+    def test_included_entities_multiple_patterns(self):
+        ef = EntityFilter(included_entities=['light.kitchen', 'switch.*', 'sensor.?_temp'])
+        assert ef.should_include_entity(make_entity('light.kitchen'))
+        assert ef.should_include_entity(make_entity('switch.garage'))
+        assert ef.should_include_entity(make_entity('sensor.a_temp'))
+        assert not ef.should_include_entity(make_entity('light.kitchen_2'))
+        assert not ef.should_include_entity(make_entity('sensor.ab_temp'))
+
     def test_empty_included_entities_allows_all(self):
         ef = EntityFilter(included_entities=[])
         assert ef.should_include_entity(make_entity('sensor.temp'))
@@ -108,6 +116,18 @@ class TestEntityFilter:
         result = ef.filter_entities(sample_entities)
         assert len(result) == len(sample_entities)
 
+    def test_filter_entities_repeated_rechecks_attributes(self):
+        ef = EntityFilter(
+            included_domains=['light'],
+            excluded_attributes={'hidden': True}
+        )
+        visible = [make_entity('light.a'), make_entity('sensor.b')]
+        assert ef.filter_entities(visible) == [visible[0]]
+        # Same entity_id on a later refresh, now hidden
+        hidden = [make_entity('light.a', hidden=True), make_entity('sensor.b')]
+        assert ef.filter_entities(hidden) == []
+        assert ef.filter_entities(visible) == [visible[0]]
+
     # -- get_domains --
 
     def test_get_domains_returns_sorted_unique(self, sample_entities):
@@ -162,6 +182,22 @@ class TestEntityFilter:
         assert 'light.kitchen' in ef.included_entities
         assert ef.excluded_attributes == {'hidden': True}
 
+    def test_from_config_builds_separate_filters_sharing_compiled_allowlist(self):
+        config = {'filters': {'included_entities': ['light.*'], 'excluded_attributes': {'hidden': True}}}
+        ef = EntityFilter.from_config(config)
+        ef2 = EntityFilter.from_config(config)
+        assert ef2 is not ef
+        assert ef2._included_re is ef._included_re
+        ef.filter_entities([make_entity('light.a')])
+        assert ef2._id_verdicts == {}
+        ef.excluded_attributes['x'] = 1
+        assert ef2.excluded_attributes == {'hidden': True}
+
+    def test_from_config_unhashable_attribute_value(self):
+        config = {'filters': {'excluded_attributes': {'rgb_color': [255, 0, 0]}}}
+        ef = EntityFilter.from_config(config)
+        assert not ef.should_include_entity(make_entity('light.a', rgb_color=[255, 0, 0]))
+
     def test_from_config_empty(self):
         ef = EntityFilter.from_config({})
         assert ef.included_domains is None
@@ -191,6 +227,34 @@ class TestEntityMapper:
         em = EntityMapper()
         assert em.get_by_id(999) is None
 
+    def test_get_by_id_out_of_range(self, sample_entities):
+        em = EntityMapper()
+        em.add_entities(sample_entities)
+        assert em.get_by_id(0) is None
+        assert em.get_by_id(-1) is None
+        assert em.get_by_id(len(sample_entities) + 1) is None
+
+    def test_get_row_projects_fields(self):
+        em = EntityMapper()
+        entity = make_entity('light.kitchen', friendly_name='Kitchen Light')
+        em.add_entities([entity])
+        row = em.get_row(1)
+        assert row.entity_id == 'light.kitchen'
+        assert row.friendly_name == 'Kitchen Light'
+        assert row.domain == 'light'
+        assert row.raw is entity
+
+    def test_get_row_falls_back_to_entity_id(self):
+        em = EntityMapper()
+        em.add_entities([{'entity_id': 'switch.garage', 'state': 'on'}])
+        row = em.get_row(1)
+        assert row.friendly_name == 'switch.garage'
+        assert row.attributes == {}
+
+    def test_get_row_nonexistent(self):
+        em = EntityMapper()
+        assert em.get_row(999) is None
+
     def test_get_id_returns_numeric(self, sample_entities):
         em = EntityMapper()
         em.add_entities(sample_entities)
@@ -263,6 +327,17 @@ class TestEntityMapper:
         em.add_entities([make_entity('light.kitchen')])
         assert em.get_id('light.kitchen') == 1
 
+    def test_generation_bumped_on_every_change(self, sample_entities):
+        em = EntityMapper()
+        seen = [em.generation]
+        em.add_entities(sample_entities)
+        seen.append(em.generation)
+        em.refresh(sample_entities[:1])
+        seen.append(em.generation)
+        em.clear()
+        seen.append(em.generation)
+        assert seen == sorted(set(seen))
+
     def test_refresh_replaces_entities(self, sample_entities):
         em = EntityMapper()
         em.add_entities(sample_entities)
@@ -273,6 +348,24 @@ class TestEntityMapper:
         # Old entities gone
         assert em.get_id('light.kitchen') is None
 
+    def test_refresh_keeps_existing_ids(self):
+        em = EntityMapper()
+        em.add_entities([make_entity('light.a'), make_entity('light.b'), make_entity('light.c')])
+        em.refresh([
+            make_entity('light.c', state='off'),
+            make_entity('light.a'),
+            make_entity('light.0_new')
+        ])
+        assert em.get_id('light.a') == 1
+        assert em.get_id('light.c') == 3
+        assert em.get_id('light.b') is None
+        assert em.get_by_id(2) is None
+        # New entities never reuse a removed ID
+        assert em.get_id('light.0_new') == 4
+        assert em.get_by_id(3)['state'] == 'off'
+        assert em.get_row(3).raw['state'] == 'off'
+        assert em.count() == 3
+
     def test_add_entities_skips_duplicates(self):
         em = EntityMapper()
         entities = [make_entity('light.kitchen')]
@@ -1,10 +1,11 @@
 """
-Tests for formatting/help.py and formatting/pagination.py
+Tests for formatting/help.py, formatting/pagination.py and formatting/entities.py
 
 Covers: format_status_line, format_table, format_welcome_message,
         format_disconnect_message, format_prompt, format_list_header,
         format_compact_list, Paginator (all methods), paginate_and_format,
-        format_page_with_entities, calculate_optimal_page_size
+        format_page_with_entities, calculate_optimal_page_size,
+        format_entity_line, format_entity_list
 """
 
 import pytest
@@ -12,6 +13,9 @@ from formatting.help import (
     format_main_menu,
     format_command_help,
     format_abbreviations,
+    format_main_menu_bytes,
+    format_command_help_bytes,
+    format_abbreviations_bytes,
     format_error_message,
     format_success_message,
     format_info_message,
@@ -26,9 +30,12 @@ from formatting.help import (
 from formatting.pagination import (
     Paginator,
     paginate_and_format,
+    paginate_and_format_iter,
+    paginate_and_format_bytes,
     format_page_with_entities,
     calculate_optimal_page_size,
 )
+from formatting.entities import format_entity_line, format_entity_list
 
 
 def make_entity(entity_id, state='on', **attrs):
@@ -200,6 +207,9 @@ class TestFormatCompactList:
     def test_empty_list(self):
         assert format_compact_list([]) == []
 
+    def test_non_string_items(self):
+        assert format_compact_list([1, 2]) == ['- 1', '- 2']
+
     def test_no_max_items_shows_all(self):
         items = [str(i) for i in range(50)]
         lines = format_compact_list(items)
@@ -283,6 +293,26 @@ class TestFormatAbbreviations:
         assert 'SW' in text
 
 
+# ---------------------------------------------------------------------------
+# Pre-encoded help blocks
+# ---------------------------------------------------------------------------
+
+class TestHelpBytes:
+    def test_main_menu_matches_lines(self):
+        expected = ''.join(line + '\r\n' for line in format_main_menu()).encode()
+        assert format_main_menu_bytes() == expected
+
+    def test_custom_eol(self):
+        assert format_abbreviations_bytes(b'\r') == (
+            '\r'.join(format_abbreviations()) + '\r'
+        ).encode()
+
+    @pytest.mark.parametrize("cmd", ['set', 'Q', 'UNKNOWN_CMD'])
+    def test_command_help_matches_lines(self, cmd):
+        expected = ''.join(line + '\r\n' for line in format_command_help(cmd)).encode()
+        assert format_command_help_bytes(cmd) == expected
+
+
 # ---------------------------------------------------------------------------
 # Paginator
 # ---------------------------------------------------------------------------
@@ -333,10 +363,34 @@ class TestPaginator:
         p = Paginator(items, page_size=5)
         assert p.get_page(999) == p.get_page(2)
 
+    def test_get_page_tuple_items(self):
+        p = Paginator(tuple(range(12)), page_size=5)
+        assert p.total_pages == 3
+        assert p.get_page(3) == (10, 11)
+
     def test_get_page_empty_list(self):
         p = Paginator([], page_size=5)
         assert p.get_page(1) == []
 
+    def test_lazy_fetches_only_requested_page(self):
+        items = list(range(12))
+        calls = []
+
+        def fetch(start, count):
+            calls.append((start, count))
+            return items[start:start + count]
+
+        p = Paginator.lazy(len(items), fetch, page_size=5)
+        assert p.total_pages == 3
+        assert p.get_page(3) == [10, 11]
+        assert list(p.iter_page(2)) == [5, 6, 7, 8, 9]
+        assert calls == [(10, 2), (5, 5)]
+
+    @pytest.mark.parametrize("page_num", [-1, 1, 2, 3, 999])
+    def test_iter_page_matches_get_page(self, page_num):
+        p = Paginator(list(range(12)), page_size=5)
+        assert list(p.iter_page(page_num)) == p.get_page(page_num)
+
     def test_get_page_info_first_page(self):
         p = Paginator(list(range(25)), page_size=10)
         info = p.get_page_info(1)
@@ -436,6 +490,26 @@ class TestPaginateAndFormat:
         # Verify the last line is an item, not a navigation hint
         assert 'next' not in lines[-1].lower()
 
+    def test_same_list_repaged_after_growth(self):
+        items = list(range(10))
+        assert paginate_and_format(items, str, page_size=5)[0] == '(pg 1/2)'
+        items.extend(range(10, 15))
+        assert paginate_and_format(items, str, page_size=5)[0] == '(pg 1/3)'
+
+    def test_bytes_matches_list(self):
+        items = list(range(15))
+        lines = paginate_and_format(items, str, page_num=2, page_size=5, title='X')
+        block = paginate_and_format_bytes(
+            items, lambda x: str(x).encode(), page_num=2, page_size=5, title='X'
+        )
+        assert block == ''.join(line + '\r\n' for line in lines).encode()
+
+    def test_iter_matches_list(self):
+        items = list(range(15))
+        it = paginate_and_format_iter(items, str, page_num=2, page_size=5, title='X')
+        assert not isinstance(it, list)
+        assert list(it) == paginate_and_format(items, str, page_num=2, page_size=5, title='X')
+
 
 # ---------------------------------------------------------------------------
 # format_page_with_entities
@@ -508,3 +582,32 @@ class TestCalculateOptimalPageSize:
     def test_zero_line_length_returns_default(self):
         result = calculate_optimal_page_size(avg_line_length=0)
         assert result == 10  # default fallback
+
+
+# ---------------------------------------------------------------------------
+# format_entity_line / format_entity_list
+# ---------------------------------------------------------------------------
+
+class TestFormatEntityLines:
+    ENTITIES = [
+        make_entity('light.kitchen', 'on', friendly_name='Kitchen Light'),
+        make_entity('sensor.temp', '72.4', friendly_name='A Very Long Sensor Name Here',
+                    unit_of_measurement='%'),
+        make_entity('switch.no_name', 'off'),
+    ]
+
+    def test_line_layout(self):
+        line = format_entity_line(1, self.ENTITIES[0], max_name_len=15)
+        assert line == '1.LT Kitchen Light   ON'
+
+    def test_long_name_truncated(self):
+        line = format_entity_line(2, self.ENTITIES[1], max_name_len=12)
+        assert line == '2.SN A Very Lo... 72%'
+
+    @pytest.mark.parametrize('max_name_len', [8, 12, 20])
+    def test_list_matches_line(self, max_name_len):
+        lines = format_entity_list(self.ENTITIES, start_id=5, max_name_len=max_name_len)
+        assert lines == [
+            format_entity_line(5 + i, entity, max_name_len)
+            for i, entity in enumerate(self.ENTITIES)
+        ]
@@ -12,11 +12,12 @@ suite with the same build always exercises the same inputs.
 """
 
 import asyncio
+import dataclasses
 import random
 import string
+import time
 import pytest
 import pyotp
-from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 
 from auth.totp import TOTPAuthenticator, SessionManager, Session
@@ -219,6 +220,15 @@ class TestParserFuzzing:
                 f"{raw!r}: unexpected error: {result.error!r}"
 
 
+    def test_pooled_commands_cannot_be_modified(self):
+        """Repeated no-arg inputs share one Command, so it must be frozen."""
+        first = parse_command("H")
+        assert parse_command("H") is first
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            first.error = "changed"
+        assert parse_command("H").error is None
+
+
 # ---------------------------------------------------------------------------
 # Auth fuzzing
 # ---------------------------------------------------------------------------
@@ -300,30 +310,25 @@ def _fuzz_session(inputs: list[str]) -> TelnetSession:
     """
     Build a TelnetSession already in authenticated state.
 
-    The mock reader plays back `inputs` one line per readline() call then
-    returns EOF. A no-op command handler is attached.
+    The reader is pre-fed with `inputs`, one LF-terminated line each, then
+    EOF. A no-op command handler is attached.
     """
     secret = pyotp.random_base32()
 
     auth = TOTPAuthenticator.__new__(TOTPAuthenticator)
     auth.users_file = "dummy.yaml"
     auth.users = {"FUZZ": secret}
+    auth._secret_keys = {"FUZZ": TOTPAuthenticator._decode_secret(secret)}
     auth.failed_attempts = {}
-    auth.used_tokens = {}
+    auth._consumed_steps = set()
+    auth._consumed_expiry = []
 
     sm = SessionManager()
 
-    line_iter = iter(inputs)
-
-    reader = AsyncMock(spec=asyncio.StreamReader)
-
-    async def fake_readline():
-        try:
-            return (next(line_iter) + "\n").encode("utf-8", errors="replace")
-        except StopIteration:
-            return b""
-
-    reader.readline = fake_readline
+    reader = asyncio.StreamReader()
+    for line in inputs:
+        reader.feed_data((line + "\n").encode("utf-8", errors="replace"))
+    reader.feed_eof()
 
     writer = MagicMock(spec=asyncio.StreamWriter)
     writer.is_closing.return_value = False
@@ -348,9 +353,9 @@ def _fuzz_session(inputs: list[str]) -> TelnetSession:
     session.callsign = "FUZZ"
     session.session = Session(
         callsign="FUZZ",
-        authenticated_at=datetime.now(),
-        last_activity=datetime.now(),
-        session_id="fuzz-0000",
+        authenticated_at=time.monotonic(),
+        last_activity=time.monotonic(),
+        session_id=b"fuzz-0000",
     )
 
     return session
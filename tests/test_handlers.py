@@ -0,0 +1,101 @@
+"""
+Tests for commands/handlers.py
+
+Covers: cached device/automation lists for L and A, HELP response,
+unknown IDs in write commands
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from commands import CommandHandler, parse_command
+from formatting import format_main_menu
+from homeassistant.filters import EntityMapper
+
+
+def make_entity(entity_id, friendly_name):
+    return {'entity_id': entity_id, 'state': 'on', 'attributes': {'friendly_name': friendly_name}}
+
+
+class TestListPartition:
+    @pytest.mark.asyncio
+    async def test_list_follows_mapper_refresh(self):
+        mapper = EntityMapper()
+        mapper.add_entities([
+            make_entity('light.kitchen', 'Kitchen Light'),
+            make_entity('automation.night', 'Night Mode'),
+        ])
+        handler = CommandHandler(ha_client=None, entity_mapper=mapper)
+
+        lines = '\n'.join(await handler.handle(parse_command('L')))
+        assert 'Kitchen Light' in lines
+
+        handler.mapper.refresh([
+            make_entity('light.porch', 'Porch Light'),
+            make_entity('automation.night', 'Night Mode'),
+        ])
+
+        lines = '\n'.join(await handler.handle(parse_command('L')))
+        assert 'Porch Light' in lines
+        assert 'Kitchen Light' not in lines
+
+    @pytest.mark.asyncio
+    async def test_partition_reused_while_mapper_unchanged(self):
+        mapper = EntityMapper()
+        mapper.add_entities([make_entity('light.kitchen', 'Kitchen Light')])
+        handler = CommandHandler(ha_client=None, entity_mapper=mapper)
+
+        await handler.handle(parse_command('L'))
+        devices = handler._devices_cache
+        await handler.handle(parse_command('A'))
+        assert handler._devices_cache is devices
+
+    @pytest.mark.asyncio
+    async def test_paging_reuses_paginator_until_refresh(self):
+        mapper = EntityMapper()
+        mapper.add_entities([make_entity(f'light.l{i}', f'Light {i}') for i in range(25)])
+        handler = CommandHandler(ha_client=None, entity_mapper=mapper, page_size=10)
+
+        await handler.handle(parse_command('L'))
+        pages = handler._devices_pages
+        lines = await handler.handle(parse_command('L 2'))
+        assert handler._devices_pages is pages
+        assert lines[0] == 'DEVICES (pg 2/3)'
+
+        mapper.refresh([make_entity('light.l0', 'Light 0')])
+        lines = await handler.handle(parse_command('L'))
+        assert handler._devices_pages is not pages
+        assert lines[0] == 'DEVICES (pg 1/1)'
+
+
+class TestUnknownId:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('text, error', [
+        ('ON 99', 'ERR: Device #99 not found'),
+        ('OFF 99', 'ERR: Device #99 not found'),
+        ('SET 99 50', 'ERR: Device #99 not found'),
+        ('T 99', 'ERR: Automation #99 not found'),
+    ])
+    async def test_write_command_rejects_unknown_id(self, text, error):
+        mapper = EntityMapper()
+        mapper.add_entities([
+            make_entity('light.kitchen', 'Kitchen Light'),
+            make_entity('automation.night', 'Night Mode'),
+        ])
+        ha = AsyncMock()
+        handler = CommandHandler(ha_client=ha, entity_mapper=mapper)
+
+        lines = await handler.handle(parse_command(text))
+
+        assert lines[0] == error
+        assert ha.mock_calls == []
+
+
+class TestHelp:
+    @pytest.mark.asyncio
+    async def test_help_returns_menu_lines(self):
+        handler = CommandHandler(ha_client=None, entity_mapper=EntityMapper())
+        response = await handler.handle(parse_command('H'))
+        assert all(isinstance(line, str) for line in response)
+        assert list(response) == format_main_menu()
+        assert 'COMMANDS' in response[0]
@@ -14,7 +14,7 @@ from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from auth.totp import TOTPAuthenticator, SessionManager
-from server.session import TelnetSession
+from server.session import TelnetSession, encode_banner
 
 
 # ---------------------------------------------------------------------------
@@ -28,11 +28,22 @@ def make_auth(secret=None, callsign='KN4XYZ'):
     auth = TOTPAuthenticator.__new__(TOTPAuthenticator)
     auth.users_file = 'dummy.yaml'
     auth.users = {callsign: secret}
+    auth._secret_keys = {callsign: TOTPAuthenticator._decode_secret(secret)}
     auth.failed_attempts = {}
-    auth.used_tokens = {}
+    auth._consumed_steps = set()
+    auth._consumed_expiry = []
     return auth, secret
 
 
+def make_reader(lines):
+    """Real StreamReader pre-fed with LF-terminated lines, then EOF."""
+    reader = asyncio.StreamReader()
+    for line in lines:
+        reader.feed_data((line + '\n').encode())
+    reader.feed_eof()
+    return reader
+
+
 def make_session(lines_to_send, callsign='KN4XYZ', secret=None, bpq_mode=True):
     """
     Build a TelnetSession with mocked reader/writer.
@@ -42,17 +53,7 @@ def make_session(lines_to_send, callsign='KN4XYZ', secret=None, bpq_mode=True):
     auth, secret = make_auth(secret=secret, callsign=callsign)
     sm = SessionManager()
 
-    reader = AsyncMock(spec=asyncio.StreamReader)
-    # readline returns bytes; each call pops from the front of lines_to_send
-    line_iter = iter(lines_to_send)
-
-    async def fake_readline():
-        try:
-            return (next(line_iter) + '\n').encode()
-        except StopIteration:
-            return b''
-
-    reader.readline = fake_readline
+    reader = make_reader(lines_to_send)
 
     writer = MagicMock(spec=asyncio.StreamWriter)
     writer.is_closing.return_value = False
@@ -77,12 +78,18 @@ def make_session(lines_to_send, callsign='KN4XYZ', secret=None, bpq_mode=True):
 
 
 def get_sent_text(writer):
-    """Collect all text sent via writer.write()."""
+    """Collect all text sent via writer.write() / writer.writelines(), in order."""
     parts = []
-    for call in writer.write.call_args_list:
-        data = call.args[0]
-        if isinstance(data, bytes):
-            parts.append(data.decode('utf-8', errors='replace'))
+    for name, args, _ in writer.method_calls:
+        if name == 'write':
+            chunks = [args[0]]
+        elif name == 'writelines':
+            chunks = list(args[0])
+        else:
+            continue
+        for data in chunks:
+            if isinstance(data, bytes):
+                parts.append(data.decode('utf-8', errors='replace'))
     return ''.join(parts)
 
 
@@ -98,17 +105,8 @@ class TestAuthenticate:
         sm = SessionManager()
         token = pyotp.TOTP(secret).now()
 
-        reader = AsyncMock(spec=asyncio.StreamReader)
         lines = [callsign, token]
-        line_iter = iter(lines)
-
-        async def fake_readline():
-            try:
-                return (next(line_iter) + '\n').encode()
-            except StopIteration:
-                return b''
-
-        reader.readline = fake_readline
+        reader = make_reader(lines)
         writer = MagicMock(spec=asyncio.StreamWriter)
         writer.is_closing.return_value = False
         writer.get_extra_info.return_value = ('127.0.0.1', 1234)
@@ -134,18 +132,9 @@ class TestAuthenticate:
         auth, secret = make_auth(callsign=callsign)
         sm = SessionManager()
 
-        reader = AsyncMock(spec=asyncio.StreamReader)
         # All attempts: callsign + bad token, repeated 3 times
         attempts = [callsign, '000000', callsign, '000000', callsign, '000000']
-        line_iter = iter(attempts)
-
-        async def fake_readline():
-            try:
-                return (next(line_iter) + '\n').encode()
-            except StopIteration:
-                return b''
-
-        reader.readline = fake_readline
+        reader = make_reader(attempts)
         writer = MagicMock(spec=asyncio.StreamWriter)
         writer.is_closing.return_value = False
         writer.get_extra_info.return_value = ('127.0.0.1', 1234)
@@ -172,18 +161,9 @@ class TestAuthenticate:
         sm = SessionManager()
         token = pyotp.TOTP(secret).now()
 
-        reader = AsyncMock(spec=asyncio.StreamReader)
         # First attempt: invalid format; second attempt: valid token
         lines = [callsign, 'abc', callsign, token]
-        line_iter = iter(lines)
-
-        async def fake_readline():
-            try:
-                return (next(line_iter) + '\n').encode()
-            except StopIteration:
-                return b''
-
-        reader.readline = fake_readline
+        reader = make_reader(lines)
         writer = MagicMock(spec=asyncio.StreamWriter)
         writer.is_closing.return_value = False
         writer.get_extra_info.return_value = ('127.0.0.1', 1234)
@@ -212,17 +192,8 @@ class TestAuthenticate:
         sm = SessionManager()
         token = pyotp.TOTP(secret).now()
 
-        reader = AsyncMock(spec=asyncio.StreamReader)
         lines = [callsign, token]
-        line_iter = iter(lines)
-
-        async def fake_readline():
-            try:
-                return (next(line_iter) + '\n').encode()
-            except StopIteration:
-                return b''
-
-        reader.readline = fake_readline
+        reader = make_reader(lines)
         writer = MagicMock(spec=asyncio.StreamWriter)
         writer.is_closing.return_value = False
         writer.get_extra_info.return_value = ('127.0.0.1', 1234)
@@ -289,6 +260,24 @@ class TestWriteOperationClassification:
         assert not cmd.is_write_operation()
 
 
+class TestTotpFormat:
+    def test_six_ascii_digits(self):
+        from server.session import _is_totp_format
+        assert _is_totp_format('012345')
+
+    def test_rejects_wrong_length_and_non_digits(self):
+        from server.session import _is_totp_format
+        assert not _is_totp_format('')
+        assert not _is_totp_format('12345')
+        assert not _is_totp_format('1234567')
+        assert not _is_totp_format('12345a')
+
+    def test_rejects_non_ascii_digits(self):
+        from server.session import _is_totp_format
+        # Arabic-Indic digits pass str.isdigit()
+        assert not _is_totp_format('١٢٣٤٥٦')
+
+
 # ---------------------------------------------------------------------------
 # send() and send_lines() helpers
 # ---------------------------------------------------------------------------
@@ -318,6 +307,26 @@ class TestSendHelpers:
         assert 'Line2' in sent
         assert 'Line3' in sent
 
+    @pytest.mark.asyncio
+    async def test_send_bytes_single_write(self):
+        session, auth, secret, writer = make_session([])
+        await session.send_bytes(b'73!\r\n')
+        writer.write.assert_called_once_with(b'73!\r\n')
+        writer.drain.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_send_lines_single_write(self):
+        session, auth, secret, writer = make_session([])
+        await session.send_lines('Line1', 'Line2')
+        writer.write.assert_called_once_with(b'Line1\r\nLine2\r\n')
+        writer.drain.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_send_lines_empty_sends_nothing(self):
+        session, auth, secret, writer = make_session([])
+        await session.send_lines()
+        writer.write.assert_not_called()
+
 
 # ---------------------------------------------------------------------------
 # Idle time tracking
@@ -342,19 +351,125 @@ class TestIdleTime:
         assert after < before
 
 
+# ---------------------------------------------------------------------------
+# read_line() buffering
+# ---------------------------------------------------------------------------
+
+class TestReadLine:
+    def _session(self):
+        session, _, _, _ = make_session([])
+        session.reader = asyncio.StreamReader()
+        return session, session.reader
+
+    @pytest.mark.asyncio
+    async def test_two_lines_in_one_chunk(self):
+        session, reader = self._session()
+        reader.feed_data(b'first\r\nsecond\r\n')
+        assert await session.read_line() == 'first'
+        assert await session.read_line() == 'second'
+
+    @pytest.mark.asyncio
+    async def test_line_split_across_chunks(self):
+        session, reader = self._session()
+
+        async def feed():
+            reader.feed_data(b'hel')
+            await asyncio.sleep(0.01)
+            reader.feed_data(b'lo\r')
+            await asyncio.sleep(0.01)
+            reader.feed_data(b'\n')
+
+        feeder = asyncio.create_task(feed())
+        assert await session.read_line() == 'hello'
+        await feeder
+
+    @pytest.mark.asyncio
+    async def test_iac_interrupt_split_across_chunks(self):
+        session, reader = self._session()
+
+        async def feed():
+            reader.feed_data(b'ab\xff')
+            await asyncio.sleep(0.01)
+            reader.feed_data(b'\xf4')
+
+        feeder = asyncio.create_task(feed())
+        assert await session.read_line() == '\x03'
+        await feeder
+
+    @pytest.mark.asyncio
+    async def test_iac_negotiation_consumed(self):
+        session, reader = self._session()
+        # IAC WILL ECHO, IAC DO SUPPRESS-GO-AHEAD around the text
+        reader.feed_data(b'\xff\xfb\x01ON\xff\xfd\x03 1\r\n')
+        assert await session.read_line() == 'ON 1'
+
+    @pytest.mark.asyncio
+    async def test_ctrl_c_mid_chunk_keeps_leftover(self):
+        session, reader = self._session()
+        reader.feed_data(b'ab\x03rest\r\n')
+        assert await session.read_line() == '\x03'
+        assert await session.read_line() == 'rest'
+
+    @pytest.mark.asyncio
+    async def test_eof_returns_none(self):
+        session, reader = self._session()
+        reader.feed_eof()
+        assert await session.read_line() is None
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_none(self):
+        session, _ = self._session()
+        assert await session.read_line(timeout=0.05) is None
+
+    @pytest.mark.asyncio
+    async def test_timeout_pushed_back_per_chunk(self):
+        """Each chunk restarts the idle timeout, even if the line takes longer overall."""
+        session, reader = self._session()
+
+        async def feed():
+            for part in (b'a', b'b', b'c', b'\n'):
+                await asyncio.sleep(0.06)
+                reader.feed_data(part)
+
+        feeder = asyncio.create_task(feed())
+        assert await session.read_line(timeout=0.1) == 'abc'
+        await feeder
+
+
+# ---------------------------------------------------------------------------
+# Banner
+# ---------------------------------------------------------------------------
+
+class TestBanner:
+    def test_encode_banner_frames_lines(self):
+        assert encode_banner('A\nB') == b'A\r\nB\r\n\r\n'
+
+    def test_encode_banner_empty(self):
+        assert encode_banner('') == b''
+
+    @pytest.mark.asyncio
+    async def test_show_banner_single_write(self):
+        session, _, _, writer = make_session([])
+        await session.show_banner(encode_banner('Hello'))
+        writer.write.assert_called_once_with(b'Hello\r\n\r\n')
+
+
 # ---------------------------------------------------------------------------
 # get_callsign / get_remote_addr / is_authenticated before auth
 # ---------------------------------------------------------------------------
 
 class TestSessionState:
-    def test_not_authenticated_initially(self):
+    @pytest.mark.asyncio
+    async def test_not_authenticated_initially(self):
         session, _, _, _ = make_session([])
         assert not session.is_authenticated()
 
-    def test_callsign_none_before_auth(self):
+    @pytest.mark.asyncio
+    async def test_callsign_none_before_auth(self):
         session, _, _, _ = make_session([])
         assert session.get_callsign() is None
 
-    def test_remote_addr_set(self):
+    @pytest.mark.asyncio
+    async def test_remote_addr_set(self):
         session, _, _, _ = make_session([])
         assert session.get_remote_addr() == '127.0.0.1:12345'
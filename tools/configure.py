@@ -302,7 +302,7 @@ def group_entities_by_domain(entities: list[dict]) -> dict[str, list[str]]:
         eid = entity.get("entity_id", "")
         if "." not in eid:
             continue
-        domain = eid.split(".")[0]
+        domain = eid.partition(".")[0]
         grouped.setdefault(domain, []).append(eid)
     for domain in grouped:
         grouped[domain].sort()
@@ -134,7 +134,7 @@ def test_error_handling():
         status = "✓" if not command.is_valid() else "✗"
         print(f"{status} {description:40s}")
         print(f"  Input:   '{input_text}'")
-        print(f"  Result:  {command.type.value}")
+        print(f"  Result:  {command.type.label}")
         if command.error:
             print(f"  Error:   {command.error}")
         print()
@@ -123,7 +123,7 @@ async def test_parsing():
 
         if should_be_valid:
             if command.is_valid() and command.type == expected_type:
-                print(f"✓ Parse '{input_text}' -> {command.type.value}")
+                print(f"✓ Parse '{input_text}' -> {command.type.label}")
                 passed += 1
             else:
                 print(f"✗ Parse '{input_text}' failed")
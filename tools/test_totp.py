@@ -7,6 +7,8 @@ Test TOTP authentication with automated or interactive modes.
 
 import sys
 import os
+import time
+from datetime import datetime
 import argparse
 import pyotp
 
@@ -122,9 +124,11 @@ def test_interactive(users_file: str):
         session = sessions.get_session(session_id)
 
         print(f"\nSession created:")
-        print(f"  Session ID: {session_id}")
+        print(f"  Session ID: {session_id.hex()}")
         print(f"  Callsign: {session.callsign}")
-        print(f"  Authenticated: {session.authenticated_at}")
+        # authenticated_at is a monotonic timestamp; convert for display
+        authenticated_at = time.time() - (time.monotonic() - session.authenticated_at)
+        print(f"  Authenticated: {datetime.fromtimestamp(authenticated_at)}")
         print(f"  Timeout: {30} minutes")
         print()
         print("✓ Ready to connect to HomeAssistant!")
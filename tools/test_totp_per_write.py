@@ -47,8 +47,8 @@ def test_is_write_operation():
         cmd = Command(type=cmd_type, raw_input=raw, device_id=1)
         result = cmd.is_write_operation()
         status = "✓" if result else "✗"
-        print(f"  {status} {cmd_type.value:12s} -> {result}")
-        assert result == True, f"{cmd_type.value} should be a write operation"
+        print(f"  {status} {cmd_type.label:12s} -> {result}")
+        assert result == True, f"{cmd_type.label} should be a write operation"
 
     # Test read operations
     read_commands = [
@@ -65,8 +65,8 @@ def test_is_write_operation():
         cmd = Command(type=cmd_type, raw_input=raw)
         result = cmd.is_write_operation()
         status = "✓" if not result else "✗"
-        print(f"  {status} {cmd_type.value:12s} -> {result}")
-        assert result == False, f"{cmd_type.value} should NOT be a write operation"
+        print(f"  {status} {cmd_type.label:12s} -> {result}")
+        assert result == False, f"{cmd_type.label} should NOT be a write operation"
 
     print("\n" + "="*60)
     print("✅ All tests passed!")
@@ -97,12 +97,12 @@ def test_command_classification():
     print("-" * 60)
 
     for cmd_type, is_write in all_commands:
-        cmd = Command(type=cmd_type, raw_input=cmd_type.value)
+        cmd = Command(type=cmd_type, raw_input=cmd_type.label)
         requires_totp = cmd.is_write_operation()
         category = "WRITE" if requires_totp else "READ"
         totp_status = "YES" if requires_totp else "NO"
-        print(f"{cmd_type.value:20s} | {totp_status:13s} | {category}")
-        assert requires_totp == is_write, f"Mismatch for {cmd_type.value}"
+        print(f"{cmd_type.label:20s} | {totp_status:13s} | {category}")
+        assert requires_totp == is_write, f"Mismatch for {cmd_type.label}"
 
     print("\n✅ Classification correct for all command types")
     return True